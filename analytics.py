@@ -0,0 +1,106 @@
+# analytics.py
+
+import numpy as np
+
+from battle import CRITICAL_HIT_CHANCE, CRITICAL_HIT_MULTIPLIER, RANDOMNESS_RANGE
+from type_chart import effectiveness_batch
+
+# Mean of the random factors battle_pokemon multiplies every score by
+EXPECTED_FACTOR = np.mean(RANDOMNESS_RANGE) * (1 + CRITICAL_HIT_CHANCE * (CRITICAL_HIT_MULTIPLIER - 1))
+BT_ITERATIONS = 500
+BT_TOLERANCE = 1e-10
+ELO_SCALE = 400 / np.log(10)  # Elo points per unit of log-strength
+ELO_BASE = 1500
+
+
+def effectiveness_matrix(type_combos):
+    """(N, N) type effectiveness of entrant i attacking entrant j."""
+    return effectiveness_batch(type_combos[:, None], type_combos[None, :])
+
+
+def expected_margin_matrix(scores, effectiveness):
+    """
+    (N, N) expected adjusted-score margin of i over j in a battle.
+
+    The random and critical-hit factors are independent of everything else,
+    so the expectation is the effective scores times their mean.
+    """
+    effective = scores[:, None] * effectiveness
+    return EXPECTED_FACTOR * (effective - effective.T)
+
+
+def bradley_terry(win_matrix, iterations=BT_ITERATIONS, tolerance=BT_TOLERANCE):
+    """
+    Fits Bradley-Terry strengths to a matrix of pairwise win probabilities.
+
+    Treats win_matrix[i, j] as the share of one game between i and j won by i
+    and runs the minorization-maximization updates (Hunter, 2004), every
+    entrant at once, until the strengths stop moving.
+
+    Returns:
+        ndarray: (N,) strengths with geometric mean 1; P(i beats j) ~ s_i / (s_i + s_j).
+    """
+    num_entrants = len(win_matrix)
+    if num_entrants < 2:
+        return np.ones(num_entrants)
+    # A small floor keeps an entrant that never wins (or never loses) finite
+    won = np.maximum(win_matrix.sum(axis=1) - np.diag(win_matrix), 1e-9)
+    strengths = np.ones(num_entrants)
+    for _ in range(iterations):
+        # sum over j != i of 1 / (s_i + s_j): the full row sum minus the diagonal term 1 / 2 s_i
+        denominator = (1 / (strengths[:, None] + strengths[None, :])).sum(axis=1) - 0.5 / strengths
+        updated = won / denominator
+        updated /= np.exp(np.log(updated).mean())
+        converged = np.max(np.abs(np.log(updated / strengths))) < tolerance
+        strengths = updated
+        if converged:
+            break
+    return strengths
+
+
+def type_coverage(effectiveness):
+    """
+    Share of the other entrants each entrant hits super-effectively, neutrally and not very effectively.
+
+    Returns:
+        dict: (N,) arrays 'advantage', 'neutral' and 'disadvantage' (fractions that sum to 1),
+        plus 'mean_effectiveness'.
+    """
+    num_entrants = len(effectiveness)
+    others = ~np.eye(num_entrants, dtype=bool)
+    count = max(num_entrants - 1, 1)
+    advantage = ((effectiveness > 1) & others).sum(axis=1) / count
+    disadvantage = ((effectiveness < 1) & others).sum(axis=1) / count
+    return {
+        'advantage': advantage,
+        'neutral': 1 - advantage - disadvantage if num_entrants > 1 else np.ones(num_entrants),
+        'disadvantage': disadvantage,
+        'mean_effectiveness': np.where(others, effectiveness, 0).sum(axis=1) / count,
+    }
+
+
+def roster_analytics(scores, type_combos, win_matrix):
+    """
+    Everything the analytics page shows, as one vectorized pass over the roster.
+
+    Parameters:
+        scores (ndarray): (N,) battle scores.
+        type_combos (ndarray): (N,) type combos.
+        win_matrix (ndarray): (N, N) pairwise win probabilities (odds.win_probability_matrix).
+
+    Returns:
+        dict: 'margin' (N, N) expected margins; 'strength' and 'elo' from the Bradley-Terry fit;
+        'expected_wins', the expected round-robin wins; 'ranking', entrant indices strongest first;
+        and the type_coverage arrays under 'coverage'.
+    """
+    effectiveness = effectiveness_matrix(type_combos)
+    strength = bradley_terry(win_matrix)
+    elo = ELO_BASE + ELO_SCALE * np.log(strength)
+    return {
+        'margin': expected_margin_matrix(scores, effectiveness),
+        'strength': strength,
+        'elo': elo,
+        'expected_wins': win_matrix.sum(axis=1) - np.diag(win_matrix),
+        'ranking': np.argsort(-strength, kind='stable'),
+        'coverage': type_coverage(effectiveness),
+    }
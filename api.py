@@ -1,37 +1,372 @@
 # api.py
 
-import requests
+import asyncio
+import functools
+import os
+import queue
 import random
+import sys
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import requests
+from requests.adapters import HTTPAdapter
 
-BASE_URL = "https://pokeapi.co/api/v2/pokemon/"
+import metrics
+from cache import PokemonCache, project_pokemon_data
+from pokemon import display_name
 
-def get_pokemon_data(pokemon_id):
-    """Fetches Pokémon data from PokeAPI by ID."""
-    try:
-        response = requests.get(f"{BASE_URL}{pokemon_id}/")
-        response.raise_for_status()
-        return response.json()
-    except requests.exceptions.RequestException as e:
-        print(f"Error fetching data for Pokémon ID {pokemon_id}: {e}")
+BASE_URL = os.environ.get("POKEAPI_BASE_URL", "https://pokeapi.co/api/v2/pokemon/")
+REQUEST_TIMEOUT = 10  # seconds
+MAX_CONCURRENCY = 8  # in-flight requests per roster fetch
+REQUESTS_PER_SECOND = 10  # sustained rate, bursts up to RATE_BURST
+RATE_BURST = 16
+MAX_ATTEMPTS_FACTOR = 5  # give up after num_pokemons * factor fetches
+OFFLINE = os.environ.get("POKEAPI_OFFLINE") == "1"  # serve only from the cache
+RETRY_ATTEMPTS = 3  # tries per ID for transient failures (timeouts, connection errors, 429, 5xx)
+BACKOFF_BASE = 0.25  # seconds; retry n waits uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** n))
+BACKOFF_MAX = 4.0
+FETCH_DEADLINE = 30  # seconds a streamed fetch may take, retries included, before its ID is replaced
+EXECUTOR_HEADROOM = 4  # fetch threads allowed per in-flight slot
+BREAKER_THRESHOLD = 5  # consecutive fetches failing transiently (after retries) that open the circuit
+BREAKER_COOLDOWN = 30  # seconds the circuit stays open before a trial request
+
+_session = None
+_session_lock = threading.Lock()
+_cache = None
+_cache_enabled = True
+
+
+class TokenBucket:
+    """Thread-safe token-bucket rate limiter."""
+
+    def __init__(self, rate=REQUESTS_PER_SECOND, capacity=RATE_BURST):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Blocks until a token is available, then consumes it."""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class CircuitBreaker:
+    """
+    Thread-safe circuit breaker around the API.
+
+    After `threshold` consecutive failed fetches the circuit opens and
+    requests are refused for `cooldown` seconds; then a single trial request
+    is let through, which closes the circuit on success or reopens it.
+    """
+
+    def __init__(self, threshold=BREAKER_THRESHOLD, cooldown=BREAKER_COOLDOWN):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at = None
+        self.lock = threading.Lock()
+
+    @property
+    def is_open(self):
+        """True while requests are being refused."""
+        with self.lock:
+            return self.opened_at is not None and time.monotonic() - self.opened_at < self.cooldown
+
+    def allow(self):
+        """Whether a request may go out now; after the cooldown this admits one trial request."""
+        with self.lock:
+            if self.opened_at is None:
+                return True
+            if time.monotonic() - self.opened_at < self.cooldown:
+                return False
+            self.opened_at = time.monotonic()  # half-open: refuse others until the trial settles
+            return True
+
+    def record_success(self):
+        with self.lock:
+            self.failures = 0
+            self.opened_at = None
+
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+            if self.failures >= self.threshold:
+                self.opened_at = time.monotonic()
+
+
+default_rate_limiter = TokenBucket()
+default_breaker = CircuitBreaker()
+
+
+def get_session():
+    """Returns the shared keep-alive session, creating it on first use."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=MAX_CONCURRENCY)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            _session = session
+        return _session
+
+
+def get_cache():
+    """Returns the persistent Pokémon cache, or None if caching is disabled."""
+    global _cache
+    with _session_lock:
+        if _cache is None and _cache_enabled:
+            _cache = PokemonCache()
+        return _cache
+
+
+def set_cache(cache):
+    """Replaces the Pokémon cache; pass None to disable caching."""
+    global _cache, _cache_enabled
+    with _session_lock:
+        _cache = cache
+        _cache_enabled = cache is not None
+
+
+def set_offline(offline):
+    """Turns offline mode on or off. Offline, only cached (even stale) data is returned."""
+    global OFFLINE
+    OFFLINE = offline
+
+
+def backoff_delay(attempt):
+    """Full-jitter exponential backoff: seconds to wait before retry number attempt + 1."""
+    return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt))
+
+
+def _is_transient(error):
+    """Whether a failed request is worth retrying: timeouts, connection errors, 429 and 5xx."""
+    if isinstance(error, (requests.exceptions.Timeout, requests.exceptions.ConnectionError)):
+        return True
+    response = getattr(error, 'response', None)
+    return response is not None and (response.status_code == 429 or response.status_code >= 500)
+
+
+def _cached(cache, pokemon_id, source, allow_stale):
+    return cache.get(pokemon_id, source, allow_stale=allow_stale) if cache is not None else None
+
+
+def _stale(cache, pokemon_id, source):
+    """Fallback after a failed or refused fetch; the first lookup already counted the miss."""
+    return cache.peek(pokemon_id, source) if cache is not None else None
+
+
+@metrics.timed('api.get_pokemon_data')
+def get_pokemon_data(pokemon_id, base_url=None, rate_limiter=None, breaker=None):
+    """
+    Fetches Pokémon data by ID, from the local cache when possible, else from PokeAPI.
+
+    Transient failures are retried up to RETRY_ATTEMPTS times with jittered
+    exponential backoff. While the circuit breaker is open no request is made;
+    like offline mode, that serves stale cached data if there is any.
+    """
+    cache = get_cache()
+    source = base_url or BASE_URL
+    data = _cached(cache, pokemon_id, source, allow_stale=OFFLINE)
+    if data is not None:
+        metrics.increment('api.cache_hits')
+        return data
+    if cache is not None:
+        metrics.increment('api.cache_misses')
+    if OFFLINE:
+        print(f"Pokémon ID {pokemon_id} is not cached and offline mode is on.", file=sys.stderr)
         return None
 
-def select_random_pokemons(num_pokemons=16, max_pokemon_id=151):
-    """Selects a list of unique random Pokémon IDs and fetches their data."""
-    selected_pokemons = []
+    breaker = breaker or default_breaker
+    if not breaker.allow():
+        metrics.increment('api.breaker_rejections')
+        return _stale(cache, pokemon_id, source)
+
+    for attempt in range(RETRY_ATTEMPTS):
+        if rate_limiter is not None:
+            rate_limiter.acquire()
+        metrics.increment('api.requests')
+        try:
+            response = get_session().get(f"{source}{pokemon_id}/", timeout=REQUEST_TIMEOUT)
+            response.raise_for_status()
+            data = project_pokemon_data(response.json())
+        except requests.exceptions.RequestException as e:
+            metrics.increment('api.request_errors')
+            transient = _is_transient(e)
+            if not transient or attempt == RETRY_ATTEMPTS - 1:
+                if transient:
+                    breaker.record_failure()
+                else:
+                    breaker.record_success()  # the API answered; the ID itself is bad
+                print(f"Error fetching data for Pokémon ID {pokemon_id}: {e}", file=sys.stderr)
+                return _stale(cache, pokemon_id, source)
+            metrics.increment('api.retries')
+            time.sleep(backoff_delay(attempt))
+            continue
+        breaker.record_success()
+        if cache is not None:
+            cache.put(pokemon_id, source, data)
+        return data
+
+
+async def stream_random_pokemons(num_pokemons=16, max_pokemon_id=151, max_concurrency=MAX_CONCURRENCY,
+                                 rate_limiter=None, base_url=None, fetch_data=None, breaker=None,
+                                 deadline=FETCH_DEADLINE, rng=None):
+    """
+    Async generator yielding unique random Pokémon payloads as they arrive.
+
+    Up to max_concurrency fetches run at once, each in a worker thread over the
+    shared keep-alive session, and each is abandoned after `deadline` seconds.
+    A failed or timed-out ID is replaced by a fresh draw; while the circuit
+    breaker is open, draws prefer IDs that are already cached. IDs are drawn
+    from rng, a numpy Generator.
+
+    Raises:
+        ValueError: If num_pokemons exceeds max_pokemon_id.
+        RuntimeError: After num_pokemons * MAX_ATTEMPTS_FACTOR fetches without enough successes.
+    """
+    if num_pokemons > max_pokemon_id:
+        raise ValueError(f"Cannot select {num_pokemons} unique Pokémon from {max_pokemon_id} IDs.")
+    rate_limiter = rate_limiter or default_rate_limiter
+    fetch_data = fetch_data or get_pokemon_data
+    breaker = breaker or default_breaker
+    rng = rng if rng is not None else np.random.default_rng()
+    cache = get_cache()
+
     selected_ids = set()
+    pending = {}  # task -> Pokémon ID
+    attempts = 0
+    max_attempts = num_pokemons * MAX_ATTEMPTS_FACTOR
 
-    while len(selected_pokemons) < num_pokemons:
-        pokemon_id = random.randint(1, max_pokemon_id)
-        if pokemon_id in selected_ids:
-            continue  # Skip if we've already selected this ID
+    def draw():
+        # Failed IDs are not marked as selected, so they may be drawn again
+        busy = selected_ids | set(pending.values())
+        candidates = [i for i in range(1, max_pokemon_id + 1) if i not in busy]
+        if breaker.is_open and cache is not None:
+            cached = [i for i in candidates if cache.contains(i, base_url or BASE_URL)]
+            candidates = cached or candidates
+        return candidates[rng.integers(len(candidates))]
 
-        data = get_pokemon_data(pokemon_id)
-        if data:
-            selected_pokemons.append(data)
-            selected_ids.add(pokemon_id)
-            name = data['name'].capitalize()
-            print(f"Selected Pokémon: {name}")
-        time.sleep(0.2)  # Be kind to the API
+    # The default executor is sized by CPU count, not by the I/O we want in flight. Threads start on
+    # demand; the headroom keeps fetches abandoned at their deadline from holding up new ones.
+    executor = ThreadPoolExecutor(max_workers=min(max_attempts, EXECUTOR_HEADROOM * max_concurrency))
+    loop = asyncio.get_running_loop()
 
-    return selected_pokemons
+    async def fetch(pokemon_id):
+        call = loop.run_in_executor(
+            executor, functools.partial(fetch_data, pokemon_id, base_url=base_url, rate_limiter=rate_limiter)
+        )
+        try:
+            return await asyncio.wait_for(call, deadline)
+        except asyncio.TimeoutError:
+            metrics.increment('api.deadline_exceeded')
+            print(f"Gave up on Pokémon ID {pokemon_id} after {deadline}s.", file=sys.stderr)
+            return None
+
+    try:
+        while len(selected_ids) < num_pokemons:
+            while (len(pending) < min(max_concurrency, num_pokemons - len(selected_ids))
+                   and attempts < max_attempts):
+                pokemon_id = draw()
+                pending[asyncio.ensure_future(fetch(pokemon_id))] = pokemon_id
+                attempts += 1
+            if not pending:
+                raise RuntimeError(
+                    f"Only fetched {len(selected_ids)} of {num_pokemons} Pokémon after {attempts} requests."
+                )
+            done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                pokemon_id = pending.pop(task)
+                data = task.result()
+                if data and len(selected_ids) < num_pokemons:
+                    selected_ids.add(pokemon_id)
+                    yield data
+    finally:
+        for task in pending:
+            task.cancel()
+        executor.shutdown(wait=False)
+
+
+def iter_random_pokemons(num_pokemons=16, max_pokemon_id=151, **options):
+    """
+    Synchronous view of stream_random_pokemons, for callers without an event loop (e.g. Streamlit).
+
+    The pipeline runs on its own event loop in a background thread; payloads
+    are yielded as they arrive and its exceptions are re-raised here.
+    Closing the iterator early stops the pipeline.
+    """
+    results = queue.Queue()
+    stop = threading.Event()
+
+    async def pump():
+        # Report from inside the loop: asyncio.run() then still waits for abandoned fetch threads,
+        # but the caller no longer does
+        try:
+            async for data in stream_random_pokemons(num_pokemons, max_pokemon_id, **options):
+                if stop.is_set():
+                    break
+                results.put((data, None))
+        except Exception as e:
+            results.put((None, e))
+        finally:
+            results.put((None, None))
+
+    threading.Thread(target=asyncio.run, args=(pump(),), daemon=True).start()
+    try:
+        while True:
+            data, error = results.get()
+            if error is not None:
+                raise error
+            if data is None:
+                return
+            yield data
+    finally:
+        stop.set()
+
+
+@metrics.timed('api.select_random_pokemons')
+def select_random_pokemons(num_pokemons=16, max_pokemon_id=151, concurrent=True,
+                           max_concurrency=MAX_CONCURRENCY, rate_limiter=None, base_url=None, pokedex=None,
+                           fetch_data=None, rng=None):
+    """
+    Selects a list of unique random Pokémon IDs and fetches their data.
+
+    Parameters:
+        num_pokemons (int): How many Pokémon to return.
+        max_pokemon_id (int): Highest Pokédex ID to draw from.
+        concurrent (bool): Fetch several IDs in parallel instead of one by one.
+        max_concurrency (int): Maximum number of requests in flight at once.
+        rate_limiter (TokenBucket): Limiter shared across calls; defaults to the module one.
+        base_url (str): Overrides BASE_URL, e.g. to point at a local stand-in server.
+        pokedex (Pokedex): Preloaded dataset to sample from instead of calling the API.
+        fetch_data (callable): Replaces get_pokemon_data (same signature), e.g. to add a caching layer.
+        rng (numpy.random.Generator): Draws the IDs; seed it for a reproducible roster.
+
+    Returns:
+        list: PokeAPI payloads (projected to the fields Pokemon uses) for the selected Pokémon,
+        sorted by Pokédex ID so the roster does not depend on which fetch finished first.
+    """
+    if pokedex is not None:
+        return pokedex.sample(num_pokemons, max_pokemon_id, rng)
+
+    selected_pokemons = []
+    for data in iter_random_pokemons(
+        num_pokemons, max_pokemon_id, max_concurrency=max_concurrency if concurrent else 1,
+        rate_limiter=rate_limiter, base_url=base_url, fetch_data=fetch_data, rng=rng
+    ):
+        selected_pokemons.append(data)
+        print(f"Selected Pokémon: {display_name(data['name'])}", file=sys.stderr)
+    return sorted(selected_pokemons, key=lambda data: data['id'])
@@ -1,10 +1,44 @@
 # app.py
 
+import io
+import time
+
+import altair as alt
+import numpy as np
+import pandas as pd
+import requests
 import streamlit as st
-import random
-from api import select_random_pokemons
-from pokemon import Pokemon
-from type_chart import type_chart
+import metrics
+from api import get_cache, get_pokemon_data, get_session, iter_random_pokemons, select_random_pokemons
+from battle_log import BYE, LOG_FULL, LOG_SUMMARY, BattleLog
+from pokedex import NATIONAL_DEX_SIZE, Pokedex
+from montecarlo import DEFAULT_SIMULATIONS, MAX_SIMULATED_ENTRANTS, simulate_championship_odds
+from optimizer import DEFAULT_BUDGET, MAX_ENTRANTS, METHODS, max_budget, optimize_weights
+from parallel import resolve_workers
+from pokemon import DEFAULT_WEIGHTS, STAT_NAMES, WEIGHT_BOUNDS, WEIGHT_STEP, Pokemon, Roster
+from results_store import ResultsStore
+from scoring import ScoreCache, weights_fingerprint
+from seeding import BATTLE_STREAM, MAX_SEED, generator, new_seed, tournament_key
+from formats import FORMATS, ROUND_ROBIN, SINGLE_ELIMINATION, SWISS, play_tournament
+from tournament import bracket_size, num_rounds
+
+MAX_POKEMON_CARDS = 64  # larger rosters are listed in a table instead
+MAX_LIVE_NAMES = 16  # live progress names the advancing Pokémon up to this many
+TABLE_PAGE_SIZE = 256  # battles per page in the results table
+CARDS_PAGE_SIZE = 8  # battles per page in the card view
+FAVOURITES_SHOWN = 5  # top entrants previewed on the Settings page
+FULL_LOG_MAX_BATTLES = 65_536  # larger tournaments only log who met whom and who won
+HEATMAP_LABELLED_MAX = 64  # larger rosters get an unlabelled pixel heatmap instead of a chart
+HEATMAP_MIN_PIXELS = 512  # small pixel heatmaps are scaled up to at least this size
+RESULTS_HISTORY = 8  # tournament keys remembered per session; the results themselves live in the store
+
+# Server-wide caches shared by every session
+CACHE_TTL = 24 * 3600  # seconds
+PAYLOAD_CACHE_ENTRIES = 2048
+POKEMON_CACHE_ENTRIES = 2048
+SPRITE_CACHE_ENTRIES = 1024
+SCORE_CACHE_ENTRIES = 8  # rosters whose score and matchup tables are kept, each up to MATCHUP_CACHE_BYTES
+SPRITE_TIMEOUT = 3  # seconds
 
 def main():
     # Set Page Configuration
@@ -12,24 +46,21 @@ def main():
     
     # Sidebar Navigation
     st.sidebar.title("Navigation")
-    page = st.sidebar.radio("Go to", ["Home", "Tournament", "Champion", "Settings"])
+    page = st.sidebar.radio("Go to", ["Home", "Tournament", "Champion", "Analytics", "Settings"])
 
     # Initialize session state variables
     if 'pokemons' not in st.session_state:
         st.session_state['pokemons'] = []
-    if 'champion' not in st.session_state:
-        st.session_state['champion'] = None
-    if 'tournament_results' not in st.session_state:
-        st.session_state['tournament_results'] = []
+    if 'results_key' not in st.session_state:
+        st.session_state['results_key'] = None  # handle of the tournament shown, in the results store
+    if 'results_history' not in st.session_state:
+        st.session_state['results_history'] = []
+    if 'odds' not in st.session_state:
+        st.session_state['odds'] = None
+    if 'optimization' not in st.session_state:
+        st.session_state['optimization'] = None
     if 'weights' not in st.session_state:
-        st.session_state['weights'] = {
-            'hp': 1.0,
-            'attack': 2.0,
-            'defense': 1.5,
-            'special-attack': 2.0,
-            'special-defense': 1.5,
-            'speed': 1.0
-        }
+        st.session_state['weights'] = dict(DEFAULT_WEIGHTS)
 
     # Page Navigation
     if page == "Home":
@@ -38,67 +69,364 @@ def main():
         tournament_page()
     elif page == "Champion":
         champion_page()
+    elif page == "Analytics":
+        analytics_page()
     elif page == "Settings":
         settings_page()
 
 def home_page():
     st.title("Home")
     
+    # Every bound follows the preloaded dataset when there is one, however few Pokémon it holds
+    pokedex = load_pokedex()
+    most_pokemons = max(2, min(1024, len(pokedex))) if pokedex is not None else 1024
+    highest_id = max(2, pokedex.max_pokemon_id) if pokedex is not None else NATIONAL_DEX_SIZE
+
     # Sidebar for selecting the number of Pokémon
-    num_pokemons = st.sidebar.slider(
+    num_pokemons = st.sidebar.number_input(
         "Select Number of Pokémon",
-        min_value=4,
-        max_value=16,
-        step=4,
-        value=8,
-        help="Choose how many Pokémon will participate in the tournament."
+        min_value=2,
+        max_value=most_pokemons,
+        value=min(8, most_pokemons),
+        help="Choose how many Pokémon will participate in the tournament. Brackets that are not a power of two get byes."
+    )
+
+    max_pokemon_id = st.sidebar.number_input(
+        "Highest Pokédex ID",
+        min_value=min(num_pokemons, highest_id),
+        max_value=highest_id,
+        value=min(highest_id, max(151, num_pokemons)),
+        help="Pokémon are drawn from IDs 1 up to this number."
     )
 
     # Button to fetch Pokémon data
     if st.sidebar.button("Fetch Pokémon"):
-        fetch_pokemons(num_pokemons)
+        fetch_pokemons(num_pokemons, max_pokemon_id)
 
     # Display fetched Pokémon
     if st.session_state['pokemons']:
         st.header("Participating Pokémon")
-        for pokemon in st.session_state['pokemons']:
-            display_pokemon(pokemon)
+        if len(st.session_state['pokemons']) <= MAX_POKEMON_CARDS:
+            for pokemon in st.session_state['pokemons']:
+                display_pokemon(pokemon)
+        else:
+            st.dataframe(
+                [{'Pokémon': p.name, 'Types': ', '.join(p.types), **p.stats} for p in st.session_state['pokemons']],
+                hide_index=True
+            )
     else:
         st.write("Click **Fetch Pokémon** in the sidebar to get the list of participating Pokémon.")
 
 def tournament_page():
     st.title("Tournament")
-    
+
+    past_tournaments_section()
     pokemons = st.session_state.get('pokemons', [])
     
     if not pokemons:
         st.warning("No Pokémon fetched. Please go to the Home page and fetch Pokémon first.")
         return
 
-    if st.button("Run Tournament"):
-        with st.spinner("Running the tournament..."):
-            try:
-                champion, tournament_results = run_tournament(pokemons)
-                st.session_state['champion'] = champion
-                st.session_state['tournament_results'] = tournament_results
-                st.success("Tournament completed!")
-            except Exception as e:
-                st.error(f"An error occurred during the tournament: {e}")
+    system = st.radio(
+        "Format", FORMATS, horizontal=True, key='format',
+        help="Round robin: everyone meets everyone. Swiss: each round pairs Pokémon with similar records."
+    )
+
+    seed_input = st.number_input(
+        "Seed", min_value=0, max_value=MAX_SEED, value=None, step=1, key='seed_input',
+        help="The same roster, weights, format and seed always give the same tournament. "
+             "Leave empty for a new seed each run."
+    )
+    results = current_results()
+    cols = st.columns(2)
+    with cols[0]:
+        run = st.button("Run Tournament")
+    with cols[1]:
+        replay = results is not None and st.button("Replay Last Tournament")
+
+    if run or replay:
+        if replay:
+            # Everything that determines the battles, as it was for that run
+            system, weights, seed = results['system'], results['weights'], results['seed']
+        else:
+            weights = dict(st.session_state['weights'])
+            seed = int(seed_input) if seed_input is not None else new_seed()
+        roster_ids = [p.id for p in pokemons]
+        key = tournament_key(roster_ids, weights, seed, system)
+        if key in get_results_store():
+            # Same roster, weights, format and seed: the stored battles are exactly what a rerun would give
+            remember_results(key)
+            st.success("Tournament replayed from the results store!" if replay
+                       else "Loaded the stored tournament for this roster, weights, format and seed.")
+        else:
+            simulate_tournament(pokemons, weights, system, seed, key)
+
+    if system == SINGLE_ELIMINATION:
+        odds_section(pokemons)
 
     # Display tournament results if available
-    if st.session_state.get('tournament_results'):
-        display_tournament_results(st.session_state['tournament_results'])
+    results = current_results()
+    if results is not None and len(results['roster_ids']) == len(pokemons):
+        if results['standings'] is not None:
+            display_standings(results['standings'], pokemons)
+        log = results['log']
+        st.caption(f"{results['system']} · seed {results['seed']} · tournament key `{results['key']}`")
+        if st.button("Export Battle Log"):
+            csv_file = io.StringIO()
+            log.to_csv(csv_file, names=[p.name for p in pokemons])
+            st.download_button("Download Battle Log (CSV)", csv_file.getvalue(), "battle_log.csv", "text/csv")
+        display_tournament_results(log, pokemons)
+
+def simulate_tournament(pokemons, weights, system, seed, key):
+    """Plays a tournament with live progress and stores it in the results store under key."""
+    progress = st.progress(0.0, text="Running the tournament...")
+    live_round = st.empty()
+    total_rounds = num_rounds(len(pokemons))
+
+    def show_progress(round_number, winners):
+        progress.progress(round_number / total_rounds, text=f"Round {round_number} of {total_rounds} complete")
+        if len(winners) <= MAX_LIVE_NAMES:
+            live_round.markdown(f"**Advancing:** {', '.join(pokemons[i].name for i in winners)}")
+        else:
+            live_round.markdown(f"**{len(winners)} Pokémon advance.**")
+
+    def show_standings(round_number, standings):
+        progress.progress(round_number / total_rounds, text=f"Round {round_number} of {total_rounds} complete")
+        leader = standings['order'][0]
+        live_round.markdown(f"**Leading:** {pokemons[leader].name} ({standings['wins'][leader]} wins)")
+
+    on_round = show_standings if system == SWISS else show_progress
+    try:
+        if st.session_state.get('profile_next_run'):
+            with metrics.profiled() as profile:
+                champion, log, standings = run_tournament(pokemons, weights, system, seed, on_round)
+            st.session_state['profile'] = profile
+            st.session_state['profile_next_run'] = False
+        else:
+            champion, log, standings = run_tournament(pokemons, weights, system, seed, on_round)
+        get_results_store().put(key, [p.id for p in pokemons], weights, seed, system, champion, log, standings)
+        remember_results(key)
+        st.success("Tournament completed!")
+    except Exception as e:
+        st.error(f"An error occurred during the tournament: {e}")
+    progress.empty()
+    live_round.empty()
+
+@st.cache_resource
+def get_results_store():
+    """The results store, opened once per server and shared by every session."""
+    return ResultsStore()
+
+def remember_results(key):
+    """Makes key the session's current tournament; only the last RESULTS_HISTORY keys are kept."""
+    history = [k for k in st.session_state['results_history'] if k != key] + [key]
+    st.session_state['results_history'] = history[-RESULTS_HISTORY:]
+    st.session_state['results_key'] = key
+
+def current_results():
+    """The stored record of the session's current tournament, or None (none run yet, or evicted)."""
+    key = st.session_state.get('results_key')
+    return get_results_store().get(key) if key else None
+
+def pokemons_by_ids(ids):
+    """Pokemon objects for Pokédex IDs, from the preloaded Pokédex when it has them, else the API cache."""
+    pokedex = load_pokedex()
+    pokemons = []
+    for pokemon_id in ids:
+        index = int(np.searchsorted(pokedex.ids, pokemon_id)) if pokedex is not None else 0
+        if pokedex is not None and index < len(pokedex) and pokedex.ids[index] == pokemon_id:
+            data = pokedex.payload(index)
+        else:
+            data = load_pokemon_data(pokemon_id)
+        pokemons.append(build_pokemon(pokemon_id, data))
+    return pokemons
+
+def load_results(key):
+    """
+    Shows a stored tournament without re-simulating it, switching to its roster if needed.
+
+    Returns:
+        bool: False if no tournament is stored under key.
+    """
+    results = get_results_store().get(key)
+    if results is None:
+        return False
+    ids = results['roster_ids'].tolist()
+    if [p.id for p in st.session_state['pokemons']] != ids:
+        st.session_state['pokemons'] = pokemons_by_ids(ids)
+        st.session_state['odds'] = None
+        st.session_state['optimization'] = None
+    remember_results(key)
+    return True
+
+def past_tournaments_section():
+    """Lists this session's stored tournaments, newest first, and reloads any tournament by key."""
+    with st.expander("Past Tournaments"):
+        recent = get_results_store().summaries(reversed(st.session_state['results_history']))
+        if recent:
+            st.dataframe([{
+                'Key': row['key'], 'Format': row['system'], 'Seed': str(row['seed']), 'Entrants': row['entrants'],
+                'Champion ID': row['champion_id'],
+                'Played': time.strftime('%Y-%m-%d %H:%M', time.localtime(row['created_at'])),
+            } for row in recent], hide_index=True)
+        key = st.text_input("Tournament key", help="Reload a stored tournament as it was played, without re-simulating it.")
+        if st.button("Load Tournament") and key:
+            try:
+                if load_results(key.strip()):
+                    st.success(f"Loaded tournament `{key.strip()}`.")
+                else:
+                    st.error(f"No stored tournament has the key `{key.strip()}`.")
+            except LookupError as e:
+                st.error(f"Could not rebuild the tournament's roster: {e}")
+
+def odds_section(pokemons):
+    """Computes championship odds exactly, or estimates them by replaying the bracket many times."""
+    st.subheader("Championship Odds")
+    if len(pokemons) > MAX_SIMULATED_ENTRANTS:
+        st.caption(f"Monte Carlo estimates are offered for rosters of up to {MAX_SIMULATED_ENTRANTS} Pokémon; "
+                   "exact odds are cheaper at this size anyway.")
+        method = "Exact"
+    else:
+        method = st.radio("Method", ["Exact", "Monte Carlo"], horizontal=True)
+    if method == "Monte Carlo":
+        cols = st.columns(3)
+        with cols[0]:
+            num_simulations = st.number_input(
+                "Simulations", min_value=1_000, max_value=1_000_000, value=DEFAULT_SIMULATIONS, step=10_000,
+                help="How many times the same bracket is replayed."
+            )
+        with cols[1]:
+            seed = st.number_input("Seed", min_value=0, value=0, help="Same seed, same odds.")
+        with cols[2]:
+            workers = st.number_input(
+                "Worker processes", min_value=1, max_value=resolve_workers(None), value=1,
+                help="Spread the simulations over several CPU cores."
+            )
+
+    weights = st.session_state['weights']
+    score_cache = get_score_cache(pokemons)
+    if st.button("Compute Odds"):
+        with st.spinner("Computing odds..."):
+            if method == "Exact":
+                odds = score_cache.exact_odds(weights)
+            else:
+                odds = simulate_championship_odds(
+                    score_cache.roster, weights, int(num_simulations), int(seed), int(workers)
+                )
+            st.session_state['odds'] = dict(odds, fingerprint=weights_fingerprint(weights))
+
+    odds = st.session_state.get('odds')
+    if odds and len(odds['champion_probability']) == len(pokemons):
+        stale = odds['fingerprint'] != weights_fingerprint(weights)
+        if stale and 'num_simulations' not in odds:
+            # Exact odds are cheap to refresh from the score cache
+            odds = st.session_state['odds'] = dict(score_cache.exact_odds(weights), fingerprint=weights_fingerprint(weights))
+            stale = False
+        if 'num_simulations' in odds:
+            st.caption(f"Estimated from {odds['num_simulations']:,} simulated tournaments.")
+        else:
+            st.caption("Exact probabilities.")
+        if stale:
+            st.warning("The battle score weights changed since these odds were simulated.")
+        display_odds(pokemons, odds)
+
+@st.cache_resource(max_entries=SCORE_CACHE_ENTRIES, ttl=CACHE_TTL, show_spinner=False)
+def shared_score_cache(roster_ids, _pokemons):
+    """One ScoreCache per roster (Pokédex IDs in roster order), shared by every session on it."""
+    return ScoreCache(Roster.from_pokemons(_pokemons))
+
+def get_score_cache(pokemons):
+    """The server-wide ScoreCache for the current roster, created on first use."""
+    return shared_score_cache(tuple(p.id for p in pokemons), pokemons)
+
+def display_odds(pokemons, odds):
+    """Shows each entrant's title odds, confidence interval if estimated, and round-by-round survival."""
+    rows = []
+    for i, pokemon in enumerate(pokemons):
+        row = {'Pokémon': pokemon.name, 'Champion %': 100 * odds['champion_probability'][i]}
+        if 'champion_ci_low' in odds:
+            row['95% CI'] = f"{100 * odds['champion_ci_low'][i]:.2f}–{100 * odds['champion_ci_high'][i]:.2f}"
+        for round_index, survival in enumerate(odds['round_survival'][:-1]):
+            row[f"Wins R{round_index + 1} %"] = 100 * survival[i]
+        rows.append(row)
+    rows.sort(key=lambda row: row['Champion %'], reverse=True)
+    st.dataframe(rows, hide_index=True)
 
 def champion_page():
     st.title("Champion")
     
-    champion = st.session_state.get('champion', None)
-    
-    if not champion:
+    results = current_results()
+    pokemons = st.session_state.get('pokemons', [])
+
+    if results is None or len(results['roster_ids']) != len(pokemons):
         st.warning("No champion yet. Please run the tournament first on the Tournament page.")
         return
 
-    display_champion(champion)
+    display_champion(pokemons[results['champion']])
+
+def analytics_page():
+    """Power rankings and the matchup heatmap, all read off the cached pairwise win matrix."""
+    st.title("Analytics")
+
+    pokemons = st.session_state.get('pokemons')
+    if not pokemons:
+        st.warning("No Pokémon fetched. Please go to the Home page and fetch Pokémon first.")
+        return
+
+    analytics = get_score_cache(pokemons).analytics(st.session_state['weights'])
+    ranking = analytics['ranking']
+    coverage = analytics['coverage']
+
+    st.subheader("Power Rankings")
+    st.write("Bradley-Terry strengths fitted to the exact pairwise win probabilities, on the Elo scale.")
+    shown = ranking[:TABLE_PAGE_SIZE]
+    st.dataframe({
+        'Rank': np.arange(1, len(shown) + 1),
+        'Pokémon': [pokemons[i].name for i in shown],
+        'Types': [', '.join(pokemons[i].types).title() for i in shown],
+        'Elo': analytics['elo'][shown].round(0),
+        'Expected Wins': analytics['expected_wins'][shown].round(2),
+        'Advantage %': (100 * coverage['advantage'][shown]).round(1),
+        'Disadvantage %': (100 * coverage['disadvantage'][shown]).round(1),
+    }, hide_index=True)
+    if len(ranking) > TABLE_PAGE_SIZE:
+        st.caption(f"Top {TABLE_PAGE_SIZE} of {len(ranking)}.")
+
+    st.subheader("Matchup Heatmap")
+    st.write("Expected score margin of the row Pokémon over the column Pokémon, strongest first.")
+    margin = analytics['margin'][np.ix_(ranking, ranking)]
+    if len(ranking) <= HEATMAP_LABELLED_MAX:
+        display_margin_chart(margin, [pokemons[i].name for i in ranking])
+    else:
+        st.image(margin_image(margin), clamp=True,
+                 caption=f"{len(ranking)} × {len(ranking)}: blue favours the row, red the column.")
+
+def display_margin_chart(margin, names):
+    """Labelled Altair heatmap of a margin matrix, diverging around an even matchup."""
+    n = len(names)
+    frame = pd.DataFrame({
+        'Pokémon': np.repeat(names, n),
+        'Opponent': np.tile(names, n),
+        'Margin': margin.ravel().round(1),
+    })
+    limit = float(np.abs(margin).max()) or 1.0
+    chart = alt.Chart(frame).mark_rect().encode(
+        x=alt.X('Opponent:N', sort=names),
+        y=alt.Y('Pokémon:N', sort=names),
+        color=alt.Color('Margin:Q', scale=alt.Scale(scheme='redblue', domain=[-limit, limit], domainMid=0)),
+        tooltip=['Pokémon', 'Opponent', 'Margin'],
+    )
+    st.altair_chart(chart)
+
+def margin_image(margin):
+    """(N, N, 3) RGB image of a margin matrix: blue where the row is favoured, red where the column is."""
+    limit = np.abs(margin).max() or 1.0
+    level = np.clip(margin / limit, -1, 1)[..., None]
+    white = np.ones(3)
+    blue, red = np.array([0.13, 0.4, 0.67]), np.array([0.7, 0.09, 0.17])
+    image = np.where(level >= 0, white + level * (blue - white), white - level * (red - white))
+    scale = max(1, -(-HEATMAP_MIN_PIXELS // len(margin)))
+    return image.repeat(scale, axis=0).repeat(scale, axis=1)
 
 def settings_page():
     st.title("Settings")
@@ -110,40 +438,224 @@ def settings_page():
     st.write("Adjust the importance of each stat in calculating the battle score.")
     
     weights = st.session_state['weights']
+    previous_fingerprint = weights_fingerprint(weights)
     
     # Update each weight using a slider
-    weights['hp'] = st.slider("HP Weight", 0.5, 2.0, weights['hp'], 0.1)
-    weights['attack'] = st.slider("Attack Weight", 1.0, 3.0, weights['attack'], 0.1)
-    weights['defense'] = st.slider("Defense Weight", 1.0, 3.0, weights['defense'], 0.1)
-    weights['special-attack'] = st.slider("Special Attack Weight", 1.0, 3.0, weights['special-attack'], 0.1)
-    weights['special-defense'] = st.slider("Special Defense Weight", 1.0, 3.0, weights['special-defense'], 0.1)
-    weights['speed'] = st.slider("Speed Weight", 0.5, 2.0, weights['speed'], 0.1)
+    weights['hp'] = st.slider("HP Weight", *WEIGHT_BOUNDS['hp'], weights['hp'], WEIGHT_STEP)
+    weights['attack'] = st.slider("Attack Weight", *WEIGHT_BOUNDS['attack'], weights['attack'], WEIGHT_STEP)
+    weights['defense'] = st.slider("Defense Weight", *WEIGHT_BOUNDS['defense'], weights['defense'], WEIGHT_STEP)
+    weights['special-attack'] = st.slider(
+        "Special Attack Weight", *WEIGHT_BOUNDS['special-attack'], weights['special-attack'], WEIGHT_STEP
+    )
+    weights['special-defense'] = st.slider(
+        "Special Defense Weight", *WEIGHT_BOUNDS['special-defense'], weights['special-defense'], WEIGHT_STEP
+    )
+    weights['speed'] = st.slider("Speed Weight", *WEIGHT_BOUNDS['speed'], weights['speed'], WEIGHT_STEP)
     
     st.session_state['weights'] = weights
     
-    st.success("Battle score weights updated!")
+    if weights_fingerprint(weights) != previous_fingerprint:
+        st.success("Battle score weights updated!")
+
+    # Live preview: exact odds come from the incremental score cache in milliseconds
+    pokemons = st.session_state.get('pokemons')
+    if pokemons:
+        st.subheader("Favourites Under These Weights")
+        odds = get_score_cache(pokemons).exact_odds(weights)
+        top = np.argsort(-odds['champion_probability'])[:FAVOURITES_SHOWN]
+        st.dataframe(
+            [{'Pokémon': pokemons[i].name, 'Champion %': 100 * odds['champion_probability'][i]} for i in top],
+            hide_index=True
+        )
+        optimizer_section(pokemons)
+
+    diagnostics_section()
+
+def optimizer_section(pokemons):
+    """Searches the slider ranges for the weights that give one Pokémon the best title odds."""
+    st.subheader("Weight Optimizer")
+    st.write("Find the weights, within the slider ranges, that maximize a Pokémon's single-elimination title odds.")
+    if len(pokemons) > MAX_ENTRANTS:
+        st.info(f"The optimizer handles rosters of up to {MAX_ENTRANTS} Pokémon; this one has {len(pokemons)}.")
+        return
+    cols = st.columns(3)
+    with cols[0]:
+        target = st.selectbox("Pokémon", range(len(pokemons)), format_func=lambda i: pokemons[i].name)
+    with cols[1]:
+        method = st.radio(
+            "Search", METHODS, horizontal=True,
+            help="Adaptive narrows in on the best weights found so far; Random and Grid sample the ranges evenly."
+        )
+    with cols[2]:
+        most = max_budget(len(pokemons))
+        budget = st.number_input(
+            "Weightings to try", min_value=64, max_value=most, value=min(DEFAULT_BUDGET, most), step=1024,
+            help="Capped so that a search over a large roster stays within seconds."
+        )
+
+    weights = st.session_state['weights']
+    if st.button("Optimize Weights"):
+        with st.spinner("Searching..."):
+            result = optimize_weights(get_score_cache(pokemons).roster, target, method, int(budget), start=weights)
+        st.session_state['optimization'] = dict(result, target=target)
+
+    result = st.session_state.get('optimization')
+    if not result:
+        return
+    name = pokemons[result['target']].name
+    if result['probability'] == 0:
+        st.info(f"No weighting within the slider ranges gives {name} a chance at the title.")
+        return
+    st.metric(
+        f"{name}'s best title odds", f"{100 * result['probability']:.2f}%",
+        delta=f"{100 * (result['probability'] - result['start_probability']):+.2f} points"
+    )
+    st.caption(
+        f"{result['evaluations']:,} weightings in {result['seconds']:.2f}s "
+        f"({result['evaluations_per_second']:,.0f}/s), {result['method']} search, seed {result['seed']}."
+    )
+    st.dataframe({
+        'Stat': STAT_NAMES,
+        'Current': [weights[stat] for stat in STAT_NAMES],
+        'Best': [result['weights'][stat] for stat in STAT_NAMES],
+    }, hide_index=True)
+    if st.button("Apply These Weights"):
+        st.session_state['weights'] = dict(result['weights'])
+        st.rerun()
+
+    st.write(f"Sensitivity: {name}'s title odds as one weight moves and the others stay at the best values.")
+    curves = result['sensitivity']
+    frame = pd.DataFrame({
+        'Stat': np.repeat(STAT_NAMES, [len(curves[stat]['values']) for stat in STAT_NAMES]),
+        'Weight': np.concatenate([curves[stat]['values'] for stat in STAT_NAMES]),
+        'Champion %': 100 * np.concatenate([curves[stat]['probability'] for stat in STAT_NAMES]),
+    })
+    st.altair_chart(alt.Chart(frame).mark_line(point=True).encode(
+        x='Weight:Q', y='Champion %:Q', color=alt.Color('Stat:N', sort=STAT_NAMES),
+        tooltip=['Stat', 'Weight', alt.Tooltip('Champion %:Q', format='.2f')],
+    ))
+
+def diagnostics_section():
+    """Server-wide timings, request counts and cache hit rates, plus an opt-in profile of one tournament."""
+    st.subheader("Diagnostics")
+    enabled = st.checkbox("Collect performance metrics (server-wide)", value=metrics.ENABLED)
+    if enabled != metrics.ENABLED:
+        metrics.set_enabled(enabled)
+    if enabled:
+        timings = metrics.snapshot()
+        if timings:
+            st.dataframe(timings, hide_index=True)
+        else:
+            st.write("Nothing recorded yet. Fetch Pokémon or run a tournament.")
+        counts = metrics.counters()
+        lookups = counts.get('api.cache_hits', 0) + counts.get('api.cache_misses', 0)
+        if lookups:
+            counts['api.cache_hit_rate'] = round(counts.get('api.cache_hits', 0) / lookups, 3)
+        cache = get_cache()
+        if cache is not None:
+            counts.update({f'cache.{key}': value for key, value in cache.stats().items()})
+        counts.update({f'results_store.{key}': value for key, value in get_results_store().stats().items()})
+        if counts:
+            st.json(counts)
+        if st.button("Reset Metrics"):
+            metrics.reset()
+
+    st.session_state['profile_next_run'] = st.checkbox(
+        "Profile the next tournament run", value=st.session_state.get('profile_next_run', False)
+    )
+    profile = st.session_state.get('profile')
+    if profile is not None:
+        with st.expander("Last Tournament Profile"):
+            st.text(profile.report)
+        st.download_button("Download Profile (.prof)", profile.data, "tournament.prof", "application/octet-stream")
+
+@st.cache_resource
+def load_pokedex():
+    """Loads the preloaded Pokédex dataset once per server, if it exists."""
+    return Pokedex.load_if_available()
+
+@st.cache_data(max_entries=PAYLOAD_CACHE_ENTRIES, ttl=CACHE_TTL, show_spinner=False)
+def load_pokemon_data(pokemon_id, base_url=None, _rate_limiter=None):
+    """Shared in-memory layer over api.get_pokemon_data; failures raise so they are not cached."""
+    data = get_pokemon_data(pokemon_id, base_url=base_url, rate_limiter=_rate_limiter)
+    if data is None:
+        raise LookupError(f"No data for Pokémon ID {pokemon_id}")
+    return data
+
+def fetch_pokemon_data(pokemon_id, base_url=None, rate_limiter=None):
+    """select_random_pokemons fetcher backed by load_pokemon_data."""
+    try:
+        return load_pokemon_data(pokemon_id, base_url, _rate_limiter=rate_limiter)
+    except LookupError:
+        return None
+
+@st.cache_resource(max_entries=POKEMON_CACHE_ENTRIES, ttl=CACHE_TTL, show_spinner=False)
+def build_pokemon(pokemon_id, _data):
+    """One shared Pokemon object per ID (the payload is not hashed, only the ID)."""
+    return Pokemon(_data)
+
+@st.cache_data(max_entries=SPRITE_CACHE_ENTRIES, ttl=CACHE_TTL, show_spinner=False)
+def load_sprite(url):
+    """
+    Downloads a sprite once per server so browsers get it from us, not the sprite CDN.
+
+    Returns None if the download fails; that is cached too, so an unreachable
+    CDN costs one timeout per sprite rather than one per rerun.
+    """
+    try:
+        response = get_session().get(url, timeout=SPRITE_TIMEOUT)
+        response.raise_for_status()
+        return response.content
+    except requests.exceptions.RequestException:
+        return None
+
+def show_sprite(url, width):
+    """Shows a sprite from the shared cache, falling back to its URL."""
+    if url:
+        st.image(load_sprite(url) or url, width=width)
+    else:
+        st.write("No image available.")
 
-def fetch_pokemons(num_pokemons):
+def fetch_pokemons(num_pokemons, max_pokemon_id=151):
     """Fetches Pokémon data and stores it in the session state."""
     try:
-        with st.spinner("Fetching Pokémon Data..."):
-            pokemon_data_list = select_random_pokemons(num_pokemons=num_pokemons)
-            pokemons = [Pokemon(data) for data in pokemon_data_list]
-            st.session_state['pokemons'] = pokemons
-            st.session_state['champion'] = None
-            st.session_state['tournament_results'] = []
+        pokedex = load_pokedex()
+        if pokedex is not None:
+            pokemon_data_list = select_random_pokemons(num_pokemons, max_pokemon_id, pokedex=pokedex)
+            pokemons = [build_pokemon(data['id'], data) for data in pokemon_data_list]
+        else:
+            pokemons = stream_pokemons(num_pokemons, max_pokemon_id)
+        st.session_state['pokemons'] = pokemons
+        st.session_state['results_key'] = None
+        st.session_state['odds'] = None
+        st.session_state['optimization'] = None
         st.success(f"Successfully fetched data for {num_pokemons} Pokémon!")
     except Exception as e:
         st.error(f"An error occurred while fetching Pokémon data: {e}")
 
+def stream_pokemons(num_pokemons, max_pokemon_id):
+    """Fetches from the API, showing each Pokémon's card as soon as its data arrives."""
+    progress = st.progress(0.0, text="Fetching Pokémon Data...")
+    arrivals = st.empty()
+    cards = arrivals.container()  # replaced by the regular listing once every Pokémon is in
+    pokemons = []
+    for data in iter_random_pokemons(num_pokemons, max_pokemon_id, fetch_data=fetch_pokemon_data):
+        pokemon = build_pokemon(data['id'], data)
+        pokemons.append(pokemon)
+        progress.progress(len(pokemons) / num_pokemons, text=f"Fetched {len(pokemons)} of {num_pokemons} Pokémon")
+        if num_pokemons <= MAX_POKEMON_CARDS:
+            with cards:
+                display_pokemon(pokemon)
+    progress.empty()
+    arrivals.empty()
+    # Same roster order as select_random_pokemons, whatever order the fetches finished in
+    return sorted(pokemons, key=lambda pokemon: pokemon.id)
+
 def display_pokemon(pokemon):
     """Displays a Pokémon's details without the ID."""
     cols = st.columns([1, 3])
     with cols[0]:
-        if pokemon.image_url:
-            st.image(pokemon.image_url, width=120)
-        else:
-            st.write("No image available.")
+        show_sprite(pokemon.image_url, width=120)
     with cols[1]:
         st.markdown(f"### {pokemon.name}")
         st.markdown(f"**Types:** {', '.join(pokemon.types)}")
@@ -151,160 +663,149 @@ def display_pokemon(pokemon):
         st.write(f"**Stats:** {stats_str}")
     st.markdown("---")
 
-def run_tournament(pokemons):
-    """Runs the tournament and returns the champion and the results."""
-    tournament_results = []
-    round_number = 1
-    current_pokemons = pokemons.copy()
-    while len(current_pokemons) > 1:
-        round_results = {'round': round_number, 'battles': []}
-        next_round = []
-        for i in range(0, len(current_pokemons), 2):
-            pokemon1 = current_pokemons[i]
-            if i + 1 < len(current_pokemons):
-                pokemon2 = current_pokemons[i + 1]
-                winner, battle_details = battle_pokemon(pokemon1, pokemon2)
-                next_round.append(winner)
-                round_results['battles'].append(battle_details)
-            else:
-                # Odd number: Pokémon1 advances automatically
-                next_round.append(pokemon1)
-                battle_details = {
-                    'attacker': pokemon1,
-                    'defender': None,
-                    'winner': pokemon1,
-                    'score1': pokemon1.get_battle_score(st.session_state['weights']),
-                    'score2': None,
-                    'adjusted_score1': pokemon1.get_battle_score(st.session_state['weights']),
-                    'adjusted_score2': None,
-                    'effectiveness1': 1.0,
-                    'effectiveness2': 1.0,
-                    'randomness1': 1.0,
-                    'randomness2': 1.0,
-                    'critical_hit1': 1,
-                    'critical_hit2': 1
-                }
-                round_results['battles'].append(battle_details)
-        tournament_results.append(round_results)
-        current_pokemons = next_round
-        round_number +=1
-
-    champion = current_pokemons[0]
-    return champion, tournament_results
-
-def battle_pokemon(attacker, defender):
-    """Simulates a battle between two Pokémon and returns the winner with detailed scoring."""
-    # Retrieve weights from session state
-    weights = st.session_state.get('weights', {
-        'hp': 1.0,
-        'attack': 2.0,
-        'defense': 1.5,
-        'special-attack': 2.0,
-        'special-defense': 1.5,
-        'speed': 1.0
-    })
-    
-    # Calculate battle scores using dynamic weights
-    score1 = attacker.get_battle_score(weights)
-    score2 = defender.get_battle_score(weights)
-
-    # Type effectiveness
-    effectiveness1 = calculate_type_effectiveness(attacker, defender)
-    effectiveness2 = calculate_type_effectiveness(defender, attacker)
-
-    # Randomness and critical hits
-    randomness1 = random.uniform(0.85, 1.0)
-    critical_hit1 = 1.5 if random.random() < 0.1 else 1
-
-    randomness2 = random.uniform(0.85, 1.0)
-    critical_hit2 = 1.5 if random.random() < 0.1 else 1
-
-    # Adjust scores based on effectiveness, randomness, and critical hits
-    adjusted_score1 = score1 * effectiveness1 * randomness1 * critical_hit1
-    adjusted_score2 = score2 * effectiveness2 * randomness2 * critical_hit2
-
-    # Determine the winner
-    if adjusted_score1 > adjusted_score2:
-        winner = attacker
-    elif adjusted_score2 > adjusted_score1:
-        winner = defender
+@metrics.timed('app.run_tournament')
+def run_tournament(pokemons, weights, system=SINGLE_ELIMINATION, seed=None, on_round=None):
+    """
+    Runs the tournament in the chosen format.
+
+    All battle randomness comes from the seed's BATTLE_STREAM, so the same
+    roster, weights, format and seed replay the same tournament.
+
+    Returns:
+        tuple: The champion's roster index, a BattleLog of the results (full unless it
+        would exceed FULL_LOG_MAX_BATTLES rows) and the final standings (None for single elimination).
+    """
+    score_cache = get_score_cache(pokemons)
+    scores, type_combos = score_cache.scores(weights), score_cache.roster.type_combos
+    num_pokemons = len(pokemons)
+    if system == ROUND_ROBIN:
+        capacity = num_pokemons * (num_pokemons - 1) // 2 + num_pokemons % 2 * num_pokemons
+    elif system == SWISS:
+        capacity = num_rounds(num_pokemons) * -(-num_pokemons // 2)
     else:
-        winner = random.choice([attacker, defender])
-
-    battle_details = {
-        'attacker': attacker,
-        'defender': defender,
-        'winner': winner,
-        'score1': score1,
-        'score2': score2,
-        'adjusted_score1': adjusted_score1,
-        'adjusted_score2': adjusted_score2,
-        'effectiveness1': effectiveness1,
-        'effectiveness2': effectiveness2,
-        'randomness1': randomness1,
-        'randomness2': randomness2,
-        'critical_hit1': critical_hit1,
-        'critical_hit2': critical_hit2
+        capacity = bracket_size(num_pokemons) - 1
+    log = BattleLog(capacity, LOG_FULL if capacity <= FULL_LOG_MAX_BATTLES else LOG_SUMMARY)
+    rng = generator(seed if seed is not None else new_seed(), BATTLE_STREAM)
+    champion_index, standings = play_tournament(system, scores, type_combos, rng, log, on_round)
+    return champion_index, log, standings
+
+def display_standings(standings, pokemons):
+    """Shows the final table, best first, up to TABLE_PAGE_SIZE rows."""
+    st.subheader("Standings")
+    order = standings['order'][:TABLE_PAGE_SIZE]
+    table = {
+        'Rank': standings['rank'][order],
+        'Pokémon': [pokemons[i].name for i in order],
+        'Wins': standings['wins'][order],
+        'Losses': standings['losses'][order],
     }
+    if standings['buchholz'].any():
+        table['Buchholz'] = standings['buchholz'][order]
+    table['Sonneborn-Berger'] = standings['sonneborn_berger'][order]
+    table['Margin'] = standings['margin'][order].round(1)
+    st.dataframe(table, hide_index=True)
+    if len(standings['order']) > TABLE_PAGE_SIZE:
+        st.caption(f"Top {TABLE_PAGE_SIZE} of {len(standings['order'])}.")
+
+@metrics.timed('app.display_tournament_results')
+def display_tournament_results(log, pokemons):
+    """
+    Displays the tournament results one round and one page at a time.
+
+    Only the selected page is rendered, so the cost of a rerun does not grow
+    with the bracket: the table view shows up to TABLE_PAGE_SIZE battles, the
+    card view up to CARDS_PAGE_SIZE.
+    """
+    rounds = list(log.rounds())
+    cols = st.columns([1, 2, 1])
+    with cols[0]:
+        views = ["Table", "Cards"] if log.full else ["Table"]  # cards need the scores of a full log
+        view = st.radio(
+            "View", views, index=int(log.full and len(log) <= CARDS_PAGE_SIZE * 2), horizontal=True, key='results_view'
+        )
+    with cols[1]:
+        choice = st.selectbox(
+            "Round", range(len(rounds)), key='results_round',
+            format_func=lambda i: f"Round {rounds[i][0]} ({count_label(rounds[i][1].stop - rounds[i][1].start, 'battle')})"
+        )
+    round_number, rows = rounds[min(choice, len(rounds) - 1)]
+    page_size = TABLE_PAGE_SIZE if view == "Table" else CARDS_PAGE_SIZE
+    num_pages = -(-(rows.stop - rows.start) // page_size)
+    with cols[2]:
+        page = st.number_input("Page", min_value=1, max_value=num_pages, value=1, key='results_page') if num_pages > 1 else 1
+    start = rows.start + (min(page, num_pages) - 1) * page_size
+    stop = min(rows.stop, start + page_size)
+
+    st.header(f"Round {round_number}")
+    if view == "Table":
+        st.dataframe(battle_table(log, pokemons, start, stop), hide_index=True)
+    else:
+        for i in range(start, stop):
+            display_battle(log.row(i), pokemons)
+
+def count_label(count, noun):
+    """'1 battle', '8 battles'."""
+    return f"{count} {noun}{'' if count == 1 else 's'}"
+
+def battle_table(log, pokemons, start, stop):
+    """Columns of a compact table for battles start..stop of the log."""
+    def name(entrant):
+        return pokemons[entrant].name if entrant != BYE else "(bye)"
+
+    table = {
+        'Pokémon 1': [name(e) for e in log['first'][start:stop]],
+        'Pokémon 2': [name(e) for e in log['second'][start:stop]],
+        'Winner': [name(e) for e in log['winner'][start:stop]],
+    }
+    if not log.full:
+        return table
+    return dict(table, **{
+        'Score 1': log['adjusted_score1'][start:stop],
+        'Score 2': log['adjusted_score2'][start:stop],
+        'Type x1': log['effectiveness1'][start:stop],
+        'Type x2': log['effectiveness2'][start:stop],
+        'Crit 1': log['critical_hit1'][start:stop] > 1,
+        'Crit 2': log['critical_hit2'][start:stop] > 1,
+    })
 
-    return winner, battle_details
-
-def calculate_type_effectiveness(attacking_pokemon, defending_pokemon):
-    """Calculates the type effectiveness multiplier."""
-    multiplier = 1.0
-    for attack_type in attacking_pokemon.types:
-        for defense_type in defending_pokemon.types:
-            effectiveness = type_chart.get(attack_type, {}).get(defense_type, 1)
-            multiplier *= effectiveness
-    return multiplier
-
-def display_tournament_results(tournament_results):
-    """Displays the tournament results with all rounds and battles."""
-    for round_info in tournament_results:
-        st.header(f"Round {round_info['round']}")
-        for battle in round_info['battles']:
-            attacker = battle['attacker']
-            defender = battle['defender']
-            winner = battle['winner']
-
-            if defender:
-                # Display battle between two Pokémon
-                cols = st.columns([2, 1, 2])
-                with cols[0]:
-                    if attacker.image_url:
-                        st.image(attacker.image_url, width=100)
-                    else:
-                        st.write("No image available.")
-                    st.markdown(f"**{attacker.name}**")
-                    st.write(f"Base Score: {battle['score1']}")
-                    st.write(f"Adjusted Score: {battle['adjusted_score1']:.2f}")
-                    st.write(f"Type Effectiveness: x{battle['effectiveness1']}")
-                    st.write(f"Randomness: x{battle['randomness1']:.2f}")
-                    if battle['critical_hit1'] > 1:
-                        st.write("**Critical Hit!**")
-
-                with cols[1]:
-                    st.markdown("<h3 style='text-align: center;'>VS</h3>", unsafe_allow_html=True)
-
-                with cols[2]:
-                    if defender.image_url:
-                        st.image(defender.image_url, width=100)
-                    else:
-                        st.write("No image available.")
-                    st.markdown(f"**{defender.name}**")
-                    st.write(f"Base Score: {battle['score2']}")
-                    st.write(f"Adjusted Score: {battle['adjusted_score2']:.2f}")
-                    st.write(f"Type Effectiveness: x{battle['effectiveness2']}")
-                    st.write(f"Randomness: x{battle['randomness2']:.2f}")
-                    if battle['critical_hit2'] > 1:
-                        st.write("**Critical Hit!**")
-
-                st.success(f"**Winner:** {winner.name}")
-                st.markdown("---")
-            else:
-                # Display Pokémon advancing automatically
-                st.markdown(f"**{attacker.name}** advances automatically.")
-                st.markdown("---")
+def display_battle(battle, pokemons):
+    """Displays one battle as a pair of cards."""
+    attacker = pokemons[battle['first']]
+    defender = pokemons[battle['second']] if battle['second'] != BYE else None
+    winner = pokemons[battle['winner']]
+
+    if defender:
+        # Display battle between two Pokémon
+        cols = st.columns([2, 1, 2])
+        with cols[0]:
+            show_sprite(attacker.image_url, width=100)
+            st.markdown(f"**{attacker.name}**")
+            st.write(f"Base Score: {battle['score1']}")
+            st.write(f"Adjusted Score: {battle['adjusted_score1']:.2f}")
+            st.write(f"Type Effectiveness: x{battle['effectiveness1']}")
+            st.write(f"Randomness: x{battle['randomness1']:.2f}")
+            if battle['critical_hit1'] > 1:
+                st.write("**Critical Hit!**")
+
+        with cols[1]:
+            st.markdown("<h3 style='text-align: center;'>VS</h3>", unsafe_allow_html=True)
+
+        with cols[2]:
+            show_sprite(defender.image_url, width=100)
+            st.markdown(f"**{defender.name}**")
+            st.write(f"Base Score: {battle['score2']}")
+            st.write(f"Adjusted Score: {battle['adjusted_score2']:.2f}")
+            st.write(f"Type Effectiveness: x{battle['effectiveness2']}")
+            st.write(f"Randomness: x{battle['randomness2']:.2f}")
+            if battle['critical_hit2'] > 1:
+                st.write("**Critical Hit!**")
+
+        st.success(f"**Winner:** {winner.name}")
+        st.markdown("---")
+    else:
+        # Display Pokémon advancing automatically
+        st.markdown(f"**{attacker.name}** advances automatically.")
+        st.markdown("---")
 
 def display_champion(champion):
     """Displays the champion on a decorated page with animations."""
@@ -330,10 +831,7 @@ def display_champion(champion):
     st.write(f"**Stats:** {stats_formatted}")
 
     # Display Image
-    if champion.image_url:
-        st.image(champion.image_url, width=300)
-    else:
-        st.write("No image available.")
+    show_sprite(champion.image_url, width=300)
     
     # Celebrate the Champion
     st.balloons()
@@ -1,8 +1,17 @@
 # battle.py
 
-import random
+import numpy as np
+
+import metrics
+from pokemon import DEFAULT_WEIGHTS
 from type_chart import type_chart
 
+RANDOMNESS_RANGE = (0.85, 1.0)
+CRITICAL_HIT_CHANCE = 0.1
+CRITICAL_HIT_MULTIPLIER = 1.5
+
+_default_rng = np.random.default_rng()  # for callers that do not care about reproducibility
+
 def calculate_type_effectiveness(attacking_pokemon, defending_pokemon):
     """Calculates the type effectiveness multiplier."""
     multiplier = 1.0
@@ -13,38 +22,94 @@ def calculate_type_effectiveness(attacking_pokemon, defending_pokemon):
     return multiplier
 
 
-def battle_pokemon(pokemon1, pokemon2):
-    """Simulates a battle between two Pokémon considering type effectiveness and returns the winner."""
-    score1 = pokemon1.get_battle_score()
-    score2 = pokemon2.get_battle_score()
+@metrics.timed('battle.battle_pokemon')
+def battle_pokemon(pokemon1, pokemon2, weights=DEFAULT_WEIGHTS, log=None, round_number=1, rng=None):
+    """
+    Simulates a battle between two Pokémon considering type effectiveness and returns the winner.
+
+    Pass a BattleLog to record the battle (keyed by Pokédex ID) instead of printing it,
+    and a numpy Generator to make it reproducible. Draws are taken in the same order
+    as resolve_battles, so both give the same result from the same generator state.
+    """
+    rng = rng if rng is not None else _default_rng
+    score1 = pokemon1.get_battle_score(weights)
+    score2 = pokemon2.get_battle_score(weights)
 
     # Type effectiveness
     effectiveness1 = calculate_type_effectiveness(pokemon1, pokemon2)
     effectiveness2 = calculate_type_effectiveness(pokemon2, pokemon1)
 
-    # Randomness and critical hits
-    randomness1 = random.uniform(0.85, 1.0)
-    critical_hit1 = 1.5 if random.random() < 0.1 else 1  # 10% chance of critical hit
+    # Randomness and critical hits, drawn in one call: the same stream positions
+    # (and values) as resolve_battles' uniform / random / uniform / random
+    low, high = RANDOMNESS_RANGE
+    draw_randomness1, draw_critical1, draw_randomness2, draw_critical2 = rng.random(4).tolist()
+    randomness1 = low + (high - low) * draw_randomness1
+    critical_hit1 = CRITICAL_HIT_MULTIPLIER if draw_critical1 < CRITICAL_HIT_CHANCE else 1
 
-    randomness2 = random.uniform(0.85, 1.0)
-    critical_hit2 = 1.5 if random.random() < 0.1 else 1  # 10% chance of critical hit
+    randomness2 = low + (high - low) * draw_randomness2
+    critical_hit2 = CRITICAL_HIT_MULTIPLIER if draw_critical2 < CRITICAL_HIT_CHANCE else 1
 
     adjusted_score1 = score1 * effectiveness1 * randomness1 * critical_hit1
     adjusted_score2 = score2 * effectiveness2 * randomness2 * critical_hit2
 
-    print(f"\nBattle between {pokemon1.name} and {pokemon2.name}!")
-    print(f"{pokemon1.name}'s Base Score: {score1}")
-    print(f"{pokemon2.name}'s Base Score: {score2}")
-    print(f"{pokemon1.name}'s Adjusted Score: {adjusted_score1:.2f} (Effectiveness x{effectiveness1}, Random x{randomness1:.2f}, Critical Hit x{critical_hit1})")
-    print(f"{pokemon2.name}'s Adjusted Score: {adjusted_score2:.2f} (Effectiveness x{effectiveness2}, Random x{randomness2:.2f}, Critical Hit x{critical_hit2})")
-
     if adjusted_score1 > adjusted_score2:
         winner = pokemon1
     elif adjusted_score2 > adjusted_score1:
         winner = pokemon2
     else:
-        winner = random.choice([pokemon1, pokemon2])
-        print("It's a tie! Winner selected at random.")
+        winner = pokemon1 if rng.random() < 0.5 else pokemon2
 
-    print(f"Winner: {winner.name}")
+    if log is not None:
+        log.append(round_number, {
+            'first': pokemon1.id,
+            'second': pokemon2.id,
+            'winner': winner.id,
+            'score1': score1,
+            'score2': score2,
+            'adjusted_score1': adjusted_score1,
+            'adjusted_score2': adjusted_score2,
+            'effectiveness1': effectiveness1,
+            'effectiveness2': effectiveness2,
+            'randomness1': randomness1,
+            'randomness2': randomness2,
+            'critical_hit1': critical_hit1,
+            'critical_hit2': critical_hit2,
+        })
     return winner
+
+
+def resolve_battles(score1, score2, effectiveness1, effectiveness2, rng):
+    """
+    Vectorized battle_pokemon over arrays of matchups of any shape.
+
+    Parameters:
+        score1, score2 (ndarray): Base battle scores of each side.
+        effectiveness1, effectiveness2 (ndarray): Type effectiveness of each side against the other.
+        rng (numpy.random.Generator): Source of the randomness, critical hit and tie-break draws.
+
+    Returns:
+        dict: 'first_wins' (bool array) plus the drawn factors and adjusted scores.
+    """
+    shape = np.shape(score1)
+    randomness1 = rng.uniform(*RANDOMNESS_RANGE, shape)
+    critical_hit1 = np.where(rng.random(shape) < CRITICAL_HIT_CHANCE, CRITICAL_HIT_MULTIPLIER, 1.0)
+    randomness2 = rng.uniform(*RANDOMNESS_RANGE, shape)
+    critical_hit2 = np.where(rng.random(shape) < CRITICAL_HIT_CHANCE, CRITICAL_HIT_MULTIPLIER, 1.0)
+
+    adjusted_score1 = score1 * effectiveness1 * randomness1 * critical_hit1
+    adjusted_score2 = score2 * effectiveness2 * randomness2 * critical_hit2
+
+    first_wins = adjusted_score1 > adjusted_score2
+    ties = adjusted_score1 == adjusted_score2
+    if ties.any():
+        first_wins |= ties & (rng.random(shape) < 0.5)
+
+    return {
+        'first_wins': first_wins,
+        'adjusted_score1': adjusted_score1,
+        'adjusted_score2': adjusted_score2,
+        'randomness1': randomness1,
+        'randomness2': randomness2,
+        'critical_hit1': critical_hit1,
+        'critical_hit2': critical_hit2,
+    }
@@ -0,0 +1,175 @@
+# battle_log.py
+
+import csv
+
+import numpy as np
+
+BYE = -1  # empty bracket slot; whoever is paired with it advances automatically
+
+# Verbosity levels: what a BattleLog records
+LOG_NONE = 'none'        # nothing; callers skip the log entirely
+LOG_SUMMARY = 'summary'  # who met whom and who won
+LOG_FULL = 'full'        # plus every score and random factor
+LOG_LEVELS = [LOG_NONE, LOG_SUMMARY, LOG_FULL]
+
+SUMMARY_COLUMNS = {'round': np.int16, 'first': np.int32, 'second': np.int32, 'winner': np.int32}
+FACTOR_COLUMNS = {
+    'score1': np.float64, 'score2': np.float64,
+    'adjusted_score1': np.float64, 'adjusted_score2': np.float64,
+    'effectiveness1': np.float32, 'effectiveness2': np.float32,
+    'randomness1': np.float64, 'randomness2': np.float64,
+    'critical_hit1': np.float32, 'critical_hit2': np.float32,
+}
+
+
+class BattleLog:
+    """
+    Columnar battle record backed by preallocated NumPy arrays.
+
+    Each row is one match. 'first', 'second' and 'winner' identify the
+    entrants: roster indices when written by the bracket engine, Pokédex IDs
+    when written by battle.battle_pokemon. 'second' is BYE for a walkover.
+    """
+
+    def __init__(self, capacity=16, verbosity=LOG_FULL):
+        if verbosity not in (LOG_SUMMARY, LOG_FULL):
+            raise ValueError(f"A BattleLog records '{LOG_SUMMARY}' or '{LOG_FULL}', not {verbosity!r}.")
+        self.verbosity = verbosity
+        self.size = 0
+        dtypes = dict(SUMMARY_COLUMNS, **(FACTOR_COLUMNS if verbosity == LOG_FULL else {}))
+        self.columns = {name: np.empty(max(1, capacity), dtype) for name, dtype in dtypes.items()}
+
+    def __len__(self):
+        return self.size
+
+    def __getitem__(self, name):
+        """The recorded values of one column."""
+        return self.columns[name][:self.size]
+
+    @property
+    def full(self):
+        return self.verbosity == LOG_FULL
+
+    def _reserve(self, count):
+        """Grows the arrays (doubling) so count more rows fit."""
+        needed = self.size + count
+        capacity = len(self.columns['round'])
+        if needed > capacity:
+            capacity = max(needed, 2 * capacity)
+            for name, column in self.columns.items():
+                grown = np.empty(capacity, column.dtype)
+                grown[:self.size] = column[:self.size]
+                self.columns[name] = grown
+
+    def append(self, round_number, record):
+        """
+        Appends a batch of matches.
+
+        Parameters:
+            round_number (int): Round the matches belong to.
+            record (dict): Equal-length arrays (or scalars for a single match) keyed by column name;
+                factor columns are only read for a full log.
+        """
+        count = len(np.atleast_1d(record['first']))
+        self._reserve(count)
+        rows = slice(self.size, self.size + count)
+        self.columns['round'][rows] = round_number
+        for name in self.columns:
+            if name != 'round':
+                self.columns[name][rows] = record[name]
+        self.size += count
+
+    def rounds(self):
+        """Yields (round_number, rows) with rows a slice covering that round's matches."""
+        round_column = self['round']
+        starts = np.flatnonzero(np.diff(round_column, prepend=round_column[:1] - 1))
+        ends = np.append(starts[1:], self.size)
+        for start, end in zip(starts, ends):
+            yield int(round_column[start]), slice(int(start), int(end))
+
+    def row(self, index):
+        """One match as a plain dict."""
+        return {name: column[index].item() for name, column in self.columns.items()}
+
+    def replay(self, names=None, out=print):
+        """
+        Re-emits the battles as text, as the engine used to print them.
+
+        Parameters:
+            names (list or dict): Maps entrant identifiers to display names.
+            out (callable): Receives each line.
+        """
+        def name(entrant):
+            return names[entrant] if names is not None else f"#{entrant}"
+
+        for round_number, rows in self.rounds():
+            out(f"\n--- Round {round_number} ---")
+            for i in range(rows.start, rows.stop):
+                battle = self.row(i)
+                first, second, winner = battle['first'], battle['second'], battle['winner']
+                if second == BYE:
+                    out(f"{name(first)} advances automatically.")
+                    continue
+                if self.full:
+                    out(f"\nBattle between {name(first)} and {name(second)}!")
+                    for side, entrant in (('1', first), ('2', second)):
+                        out(f"{name(entrant)}'s Base Score: {battle['score' + side]}")
+                    for side, entrant in (('1', first), ('2', second)):
+                        out(
+                            f"{name(entrant)}'s Adjusted Score: {battle['adjusted_score' + side]:.2f} "
+                            f"(Effectiveness x{battle['effectiveness' + side]}, "
+                            f"Random x{battle['randomness' + side]:.2f}, "
+                            f"Critical Hit x{battle['critical_hit' + side]})"
+                        )
+                    out(f"Winner: {name(winner)}")
+                else:
+                    out(f"{name(first)} vs {name(second)}: {name(winner)} wins")
+
+    def to_csv(self, path, names=None, prefix=None, header=True):
+        """
+        Writes one row per match to a path or text file object.
+
+        Parameters:
+            names (list or dict): Adds entrant name columns.
+            prefix (dict): Constant leading columns, e.g. {'tournament': 3} when several logs share a file.
+            header (bool): Write the header row; False when appending to a file that has one.
+        """
+        if hasattr(path, 'write'):
+            self._write_csv(path, names, prefix or {}, header)
+        else:
+            with open(path, 'w', newline='', encoding='utf-8') as f:
+                self._write_csv(f, names, prefix or {}, header)
+
+    def _write_csv(self, f, names, prefix, header):
+        writer = csv.writer(f)
+        if header:
+            writer.writerow(list(prefix) + list(self.columns) + (
+                ['first_name', 'second_name', 'winner_name'] if names is not None else []
+            ))
+        for i in range(self.size):
+            battle = self.row(i)
+            values = list(prefix.values()) + list(battle.values())
+            if names is not None:
+                values += [names[battle[key]] if battle[key] != BYE else '' for key in ('first', 'second', 'winner')]
+            writer.writerow(values)
+
+    def to_npz(self, path):
+        """Writes the columns to a compressed .npz file (path or binary file object) that load() reads back."""
+        np.savez_compressed(path, verbosity=np.array(self.verbosity), **{
+            name: self[name] for name in self.columns
+        })
+
+    def to_parquet(self, path):
+        """Writes the columns to Parquet (needs pandas with pyarrow installed)."""
+        import pandas as pd
+        pd.DataFrame({name: self[name] for name in self.columns}).to_parquet(path, index=False)
+
+    @classmethod
+    def load(cls, path):
+        """Reads a log written by to_npz()."""
+        with np.load(path) as data:
+            log = cls(capacity=len(data['round']), verbosity=str(data['verbosity']))
+            for name in log.columns:
+                log.columns[name][:len(data[name])] = data[name]
+            log.size = len(data['round'])
+        return log
@@ -0,0 +1,221 @@
+# bench.py
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+from types import SimpleNamespace
+
+import numpy as np
+
+import api
+from battle import battle_pokemon, calculate_type_effectiveness, resolve_battles
+from mock_pokeapi import fake_pokemon_data, start_server
+from optimizer import random_candidates, target_odds
+from pokemon import DEFAULT_WEIGHTS, Pokemon, Roster
+from tournament import run_tournament
+from type_chart import NUM_COMBOS, TYPE_NAMES, effectiveness_batch, type_combo
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bench_baseline.json")
+BRACKET_SIZES = [8, 64, 512, 4096, 65536]
+FETCH_LATENCY = 0.05  # seconds the mock server waits per request
+TOLERANCE = 0.25  # allowed relative loss of throughput or growth of memory before failing
+
+
+def random_types(rng):
+    """Draws a one- or two-type combination."""
+    return rng.sample(TYPE_NAMES, rng.choice([1, 2]))
+
+
+def synthetic_roster(num_pokemons, seed=0):
+    """A reproducible roster of fake Pokémon, without any network access."""
+    return [Pokemon(fake_pokemon_data(1 + (seed * 100_003 + i) % 1_000_000)) for i in range(num_pokemons)]
+
+
+def synthetic_arrays(num_entrants, seed=0):
+    """Scores and type combos for a large synthetic bracket, skipping Pokemon objects."""
+    rng = np.random.default_rng(seed)
+    roster = Roster(np.arange(num_entrants), rng.integers(20, 150, (num_entrants, 6)),
+                    rng.integers(0, NUM_COMBOS, num_entrants))
+    return roster.scores(DEFAULT_WEIGHTS), roster.type_combos
+
+
+def measure(func, ops, repeats=3):
+    """
+    Runs func() repeats times and reports the best throughput and the peak traced memory.
+
+    Returns:
+        dict: 'ops_per_s' (ops / best wall time), 'seconds' (best wall time) and 'peak_kb'.
+    """
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    tracemalloc.start()
+    func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {'ops_per_s': ops / best, 'seconds': best, 'peak_kb': peak / 1024}
+
+
+def bench_battle_score(num_pokemons=10_000):
+    """Per-object get_battle_score against one batched Roster.scores call."""
+    pokemons = synthetic_roster(num_pokemons)
+    roster = Roster.from_pokemons(pokemons)
+    return {
+        'battle_score.per_pokemon': measure(
+            lambda: [p.get_battle_score(DEFAULT_WEIGHTS) for p in pokemons], num_pokemons),
+        'battle_score.roster': measure(lambda: roster.scores(DEFAULT_WEIGHTS), num_pokemons),
+    }
+
+
+def bench_type_effectiveness(num_matchups=100_000, seed=0):
+    """Per-pair dict lookups against the batched COMBO_MATRIX gather, checking they agree."""
+    rng = random.Random(seed)
+    attackers = [SimpleNamespace(types=random_types(rng)) for _ in range(num_matchups)]
+    defenders = [SimpleNamespace(types=random_types(rng)) for _ in range(num_matchups)]
+    attacker_combos = np.array([type_combo(a.types) for a in attackers])
+    defender_combos = np.array([type_combo(d.types) for d in defenders])
+
+    expected = [calculate_type_effectiveness(a, d) for a, d in zip(attackers, defenders)]
+    if not np.array_equal(effectiveness_batch(attacker_combos, defender_combos), expected):
+        raise AssertionError("batched effectiveness differs from calculate_type_effectiveness")
+    return {
+        'type_effectiveness.per_pair': measure(
+            lambda: [calculate_type_effectiveness(a, d) for a, d in zip(attackers, defenders)], num_matchups),
+        'type_effectiveness.batch': measure(
+            lambda: effectiveness_batch(attacker_combos, defender_combos), num_matchups),
+    }
+
+
+def bench_battles(num_battles=100_000, seed=0):
+    """battle_pokemon one call at a time against resolve_battles on arrays."""
+    pokemons = synthetic_roster(64, seed)
+    pairs = [(pokemons[i % 64], pokemons[(i * 7 + 1) % 64]) for i in range(num_battles // 10)]
+    scores, type_combos = synthetic_arrays(num_battles, seed)
+    rng = np.random.default_rng(seed)
+    opponents = np.roll(np.arange(num_battles), 1)
+
+    def batch():
+        resolve_battles(scores, scores[opponents],
+                        effectiveness_batch(type_combos, type_combos[opponents]),
+                        effectiveness_batch(type_combos[opponents], type_combos), rng)
+
+    return {
+        'battle.battle_pokemon': measure(
+            lambda: [battle_pokemon(a, b, DEFAULT_WEIGHTS, rng=rng) for a, b in pairs], len(pairs)),
+        'battle.resolve_battles': measure(batch, num_battles),
+    }
+
+
+def bench_tournament(sizes=BRACKET_SIZES, seed=0):
+    """run_tournament on a synthetic roster per bracket size (ops are battles, byes included)."""
+    results = {}
+    largest = synthetic_roster(max(sizes), seed)
+    for size in sizes:
+        pokemons = largest[:size]
+        results[f'tournament.run_{size}'] = measure(
+            lambda: run_tournament(pokemons, DEFAULT_WEIGHTS, np.random.default_rng(seed)), size - 1)
+    return results
+
+
+def bench_fetch(num_pokemons=16, latency=FETCH_LATENCY, seed=0):
+    """select_random_pokemons against the local mock server, with the persistent cache disabled."""
+    server, base_url = start_server(latency=latency)
+    previous_cache = api.get_cache()
+    api.set_cache(None)
+    try:
+        def fetch(concurrent):
+            with contextlib.redirect_stderr(io.StringIO()):  # keep the per-Pokémon progress lines quiet
+                api.select_random_pokemons(num_pokemons, 151, concurrent=concurrent,
+                                           rate_limiter=api.TokenBucket(rate=1000, capacity=1000), base_url=base_url,
+                                           rng=np.random.default_rng(seed))
+        return {
+            'fetch.sequential': measure(lambda: fetch(False), num_pokemons, repeats=1),
+            'fetch.concurrent': measure(lambda: fetch(True), num_pokemons, repeats=1),
+        }
+    finally:
+        api.set_cache(previous_cache)
+        server.shutdown()
+
+
+def bench_optimizer(sizes=(16, 64), num_weightings=1024, seed=0):
+    """Exact title odds of one entrant under a batch of weightings (ops are weightings)."""
+    results = {}
+    weightings = random_candidates(np.random.default_rng(seed), num_weightings)
+    for size in sizes:
+        roster = Roster.from_pokemons(synthetic_roster(size, seed))
+        results[f'optimizer.target_odds_{size}'] = measure(lambda: target_odds(roster, weightings, 0), num_weightings)
+    return results
+
+
+BENCHMARKS = [
+    bench_battle_score, bench_type_effectiveness, bench_battles, bench_tournament, bench_fetch, bench_optimizer
+]
+
+
+def run_all():
+    """Runs every benchmark with fixed seeds and returns {name: metrics}."""
+    results = {}
+    for benchmark in BENCHMARKS:
+        results.update(benchmark())
+    return results
+
+
+def compare(results, baseline, tolerance=TOLERANCE):
+    """Lists the benchmarks whose throughput dropped or memory grew by more than tolerance."""
+    regressions = []
+    for name, metrics in results.items():
+        reference = baseline.get(name)
+        if reference is None:
+            continue
+        if metrics['ops_per_s'] < reference['ops_per_s'] * (1 - tolerance):
+            regressions.append(f"{name}: {metrics['ops_per_s']:,.0f} ops/s vs baseline {reference['ops_per_s']:,.0f}")
+        if metrics['peak_kb'] > reference['peak_kb'] * (1 + tolerance) + 64:
+            regressions.append(f"{name}: {metrics['peak_kb']:,.0f} KB peak vs baseline {reference['peak_kb']:,.0f}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks for the battle, tournament and fetch hot paths.")
+    parser.add_argument('--json', help="Write the results to this file ('-' for stdout).")
+    parser.add_argument('--baseline', default=BASELINE_PATH, help="Baseline file to compare against.")
+    parser.add_argument('--save-baseline', action='store_true', help="Store these results as the new baseline.")
+    parser.add_argument('--tolerance', type=float, default=TOLERANCE)
+    args = parser.parse_args()
+
+    results = run_all()
+    for name, metrics in results.items():
+        print(f"{name:36s} {metrics['ops_per_s']:>16,.0f} ops/s {metrics['seconds'] * 1e3:>10.2f} ms "
+              f"{metrics['peak_kb']:>10,.0f} KB peak", file=sys.stderr)
+
+    if args.json:
+        output = json.dumps(results, indent=2, sort_keys=True)
+        if args.json == '-':
+            print(output)
+        else:
+            with open(args.json, 'w') as f:
+                f.write(output + '\n')
+
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+            f.write('\n')
+        print(f"Saved baseline to {args.baseline}", file=sys.stderr)
+    elif os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+# cache.py
+
+import json
+import os
+import sqlite3
+import threading
+import time
+
+CACHE_PATH = os.environ.get(
+    "POKEMON_CACHE_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".pokemon_cache.sqlite"),
+)
+DEFAULT_TTL = 30 * 24 * 3600  # seconds; species data practically never changes
+DEFAULT_MAX_ENTRIES = 2048
+
+
+def project_pokemon_data(data):
+    """Keeps only the fields Pokemon uses, in the same shape PokeAPI returns them."""
+    return {
+        'name': data['name'],
+        'id': data['id'],
+        'types': [{'type': {'name': t['type']['name']}} for t in data['types']],
+        'stats': [{'stat': {'name': s['stat']['name']}, 'base_stat': s['base_stat']} for s in data['stats']],
+        'sprites': {'front_default': data['sprites']['front_default']},
+    }
+
+
+class PokemonCache:
+    """
+    Persistent SQLite cache of projected Pokémon payloads.
+
+    Entries are keyed by (source, Pokémon ID), the source being the API base
+    URL they were fetched from, so a local stand-in server never shadows the
+    real PokeAPI (or the other way round). Entries older than `ttl` seconds
+    count as misses (but can still be served with allow_stale=True, e.g. in
+    offline mode). When more than `max_entries` are stored, the least
+    recently used ones are evicted.
+    """
+
+    def __init__(self, path=CACHE_PATH, ttl=DEFAULT_TTL, max_entries=DEFAULT_MAX_ENTRIES):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        # Entries of the original ID-only table cannot be traced to a source; drop them
+        self.conn.execute("DROP TABLE IF EXISTS pokemon")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS payloads ("
+            " source TEXT NOT NULL,"
+            " id INTEGER NOT NULL,"
+            " payload TEXT NOT NULL,"
+            " fetched_at REAL NOT NULL,"
+            " accessed_at REAL NOT NULL,"
+            " PRIMARY KEY (source, id))"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS payloads_accessed ON payloads (accessed_at)")
+
+    def get(self, pokemon_id, source, allow_stale=False):
+        """Returns the cached payload for an ID from a source, or None on a miss."""
+        now = time.time()
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT payload, fetched_at FROM payloads WHERE source = ? AND id = ?", (source, pokemon_id)
+            ).fetchone()
+            if row is None or (not allow_stale and now - row[1] > self.ttl):
+                self.misses += 1
+                return None
+            self.conn.execute(
+                "UPDATE payloads SET accessed_at = ? WHERE source = ? AND id = ?", (now, source, pokemon_id)
+            )
+            self.hits += 1
+        return json.loads(row[0])
+
+    def peek(self, pokemon_id, source):
+        """The cached payload (fresh or stale) or None, without touching the counters or LRU order."""
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT payload FROM payloads WHERE source = ? AND id = ?", (source, pokemon_id)
+            ).fetchone()
+        return json.loads(row[0]) if row is not None else None
+
+    def contains(self, pokemon_id, source):
+        """Whether an entry (fresh or stale) exists, without touching the counters or LRU order."""
+        with self.lock:
+            return self.conn.execute(
+                "SELECT 1 FROM payloads WHERE source = ? AND id = ?", (source, pokemon_id)
+            ).fetchone() is not None
+
+    def put(self, pokemon_id, source, data):
+        """Stores the projected payload for an ID from a source and evicts LRU entries over the cap."""
+        payload = json.dumps(project_pokemon_data(data), separators=(',', ':'))
+        now = time.time()
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO payloads (source, id, payload, fetched_at, accessed_at)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (source, pokemon_id, payload, now, now),
+            )
+            excess = self.conn.execute("SELECT COUNT(*) FROM payloads").fetchone()[0] - self.max_entries
+            if excess > 0:
+                self.conn.execute(
+                    "DELETE FROM payloads WHERE rowid IN "
+                    "(SELECT rowid FROM payloads ORDER BY accessed_at LIMIT ?)",
+                    (excess,),
+                )
+                self.evictions += excess
+
+    def clear(self):
+        """Removes every entry and resets the counters."""
+        with self.lock:
+            self.conn.execute("DELETE FROM payloads")
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self):
+        """Returns hit/miss counters and the current size."""
+        with self.lock:
+            size = self.conn.execute("SELECT COUNT(*) FROM payloads").fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'size': size,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+        }
@@ -0,0 +1,150 @@
+# cli.py
+
+import argparse
+import csv
+import json
+import sys
+import time
+from functools import partial
+
+import numpy as np
+
+import seeding
+from battle_log import LOG_FULL, LOG_LEVELS, LOG_NONE, BattleLog
+from formats import FORMATS, SINGLE_ELIMINATION, play_tournament
+from pokedex import POKEDEX_PATH, Pokedex
+from pokemon import DEFAULT_WEIGHTS, STAT_NAMES, Pokemon, Roster, display_name
+from tournament import bracket_size, run_tournaments
+
+OUTPUT_FORMATS = ['csv', 'jsonl']
+SYSTEMS = {name.lower().replace(' ', '-'): name for name in FORMATS}  # command-line spelling -> format
+SUMMARY_SHOWN = 5  # most frequent champions reported at the end of a batch
+
+
+def parse_weights(text):
+    """
+    Parses 'attack=2.5,speed=1.2' into a full weights dict; unlisted stats keep their default.
+
+    Raises:
+        ValueError: On an unknown stat or a malformed entry.
+    """
+    weights = dict(DEFAULT_WEIGHTS)
+    for item in filter(None, (part.strip() for part in (text or '').split(','))):
+        stat, _, value = item.partition('=')
+        if stat not in STAT_NAMES or not value:
+            raise ValueError(f"Expected stat=value with stat one of {', '.join(STAT_NAMES)}, got {item!r}.")
+        weights[stat] = float(value)
+    return weights
+
+
+def load_roster(num_pokemons, max_pokemon_id, ids=None, pokedex_path=POKEDEX_PATH, rng=None, base_url=None):
+    """
+    Builds the roster from the preloaded Pokédex when it covers the request, else from the API.
+
+    The API path goes through api.get_pokemon_data and so its persistent cache;
+    the network stack is only imported when it is needed. rng (a numpy Generator)
+    draws the random roster.
+
+    Returns:
+        tuple: (Roster, list of entrant display names, as Pokemon.name spells them).
+    """
+    pokedex = Pokedex.load_if_available(pokedex_path)
+    rng = rng if rng is not None else np.random.default_rng()
+    if pokedex is not None:
+        if ids is None:
+            indices = pokedex.sample_indices(num_pokemons, max_pokemon_id, rng)
+            return pokedex.roster(indices), [display_name(pokedex.names[i]) for i in indices]
+        indices = np.searchsorted(pokedex.ids, ids)
+        if np.all(indices < len(pokedex)) and np.array_equal(pokedex.ids[np.minimum(indices, len(pokedex) - 1)], ids):
+            return pokedex.roster(indices), [display_name(pokedex.names[i]) for i in indices]
+
+    import api
+    if ids is None:
+        payloads = api.select_random_pokemons(num_pokemons, max_pokemon_id, base_url=base_url, rng=rng)
+    else:
+        payloads = [api.get_pokemon_data(pokemon_id, base_url=base_url) for pokemon_id in ids]
+        missing = [pokemon_id for pokemon_id, data in zip(ids, payloads) if data is None]
+        if missing:
+            raise LookupError(f"Could not fetch Pokémon IDs {missing}.")
+    pokemons = [Pokemon(data) for data in payloads]
+    return Roster.from_pokemons(pokemons), [p.name for p in pokemons]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run Pokémon tournaments headlessly and stream the champions.")
+    parser.add_argument('-n', '--tournaments', type=int, default=1, help="Number of tournaments to run.")
+    parser.add_argument('--num-pokemons', type=int, default=16, help="Entrants per tournament.")
+    parser.add_argument('--max-id', type=int, default=151, help="Highest Pokédex ID to draw entrants from.")
+    parser.add_argument('--ids', help="Comma-separated Pokédex IDs to use as the roster instead of a random draw.")
+    parser.add_argument('--weights', help="Stat weights as stat=value pairs, e.g. attack=2.5,speed=1.2.")
+    parser.add_argument('--seed', type=int, help="Root seed of the roster draw and the battles (default: a fresh one, "
+                                                 "reported on stderr).")
+    parser.add_argument('--pokedex', default=POKEDEX_PATH, help="Preloaded dataset to take the roster from.")
+    parser.add_argument('--base-url', help="PokeAPI base URL, when the roster has to be fetched.")
+    parser.add_argument('--system', choices=list(SYSTEMS), default='single-elimination', help="Tournament format.")
+    parser.add_argument('--format', choices=OUTPUT_FORMATS, default='csv')
+    parser.add_argument('-o', '--output', help="File to write to (default: stdout).")
+    parser.add_argument('--log-level', choices=LOG_LEVELS, help="Battle log verbosity (default: "
+                                                                f"'{LOG_FULL}' with --log-out, else '{LOG_NONE}').")
+    parser.add_argument('--log-out', help="CSV file to write every battle to, with a tournament column.")
+    args = parser.parse_args(argv)
+    log_level = args.log_level or (LOG_FULL if args.log_out else LOG_NONE)
+    if (log_level != LOG_NONE) != bool(args.log_out):
+        parser.error("--log-out needs a --log-level other than 'none', and the reverse.")
+
+    try:
+        weights = parse_weights(args.weights)
+        ids = [int(i) for i in args.ids.split(',')] if args.ids else None
+    except ValueError as e:
+        parser.error(str(e))
+
+    seed = args.seed if args.seed is not None else seeding.new_seed()
+    start = time.perf_counter()
+    roster, names = load_roster(
+        args.num_pokemons, args.max_id, ids, args.pokedex, seeding.generator(seed, seeding.ROSTER_STREAM),
+        args.base_url
+    )
+    out = open(args.output, 'w', newline='', encoding='utf-8') if args.output else sys.stdout
+    log_out = open(args.log_out, 'w', newline='', encoding='utf-8') if args.log_out else None
+    try:
+        writer = csv.writer(out) if args.format == 'csv' else None
+        if writer is not None:
+            writer.writerow(['tournament', 'champion_id', 'champion_name'])
+        wins = np.zeros(len(roster), dtype=np.int64)
+        rng = seeding.generator(seed, seeding.BATTLE_STREAM)
+        system = SYSTEMS[args.system]
+        log_factory = partial(BattleLog, bracket_size(len(roster)) - 1, log_level) if log_level != LOG_NONE else None
+        if system == SINGLE_ELIMINATION:
+            results = run_tournaments(roster, weights, args.tournaments, rng, log_factory)
+        else:
+            scores = roster.scores(weights)
+
+            def play(log):
+                return play_tournament(system, scores, roster.type_combos, rng, log)[0], log
+
+            results = (play(log_factory() if log_factory is not None else None) for _ in range(args.tournaments))
+        for number, (champion, log) in enumerate(results, start=1):
+            wins[champion] += 1
+            if log is not None:
+                log.to_csv(log_out, names, prefix={'tournament': number}, header=number == 1)
+            row = [number, int(roster.ids[champion]), names[champion]]
+            if writer is not None:
+                writer.writerow(row)
+            else:
+                out.write(json.dumps(dict(zip(['tournament', 'champion_id', 'champion_name'], row))) + '\n')
+    finally:
+        if out is not sys.stdout:
+            out.close()
+        if log_out is not None:
+            log_out.close()
+
+    elapsed = time.perf_counter() - start
+    print(f"Ran {args.tournaments} tournaments of {len(roster)} Pokémon in {elapsed:.3f}s (seed {seed}).",
+          file=sys.stderr)
+    for i in np.argsort(-wins, kind='stable')[:SUMMARY_SHOWN]:
+        if wins[i]:
+            print(f"  {names[i]}: {wins[i]} titles ({wins[i] / args.tournaments:.1%})", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
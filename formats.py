@@ -0,0 +1,247 @@
+# formats.py
+
+import numpy as np
+
+from battle import resolve_battles
+from battle_log import BYE
+from tournament import match_record, num_rounds, simulate_bracket
+from type_chart import effectiveness_batch
+
+SINGLE_ELIMINATION = 'Single elimination'
+ROUND_ROBIN = 'Round robin'
+SWISS = 'Swiss'
+FORMATS = [SINGLE_ELIMINATION, ROUND_ROBIN, SWISS]
+
+
+def play_matches(scores, type_combos, first, second, rng):
+    """
+    Plays any number of independent matches as one batched operation.
+
+    Parameters:
+        scores (ndarray): (N,) battle scores.
+        type_combos (ndarray): (N,) type combos.
+        first, second (ndarray): Entrant indices per match; second may be BYE for a walkover,
+            which first wins without a battle.
+        rng (numpy.random.Generator): Source of all battle randomness.
+
+    Returns:
+        dict: 'winner' and 'played' per match, plus 'effectiveness1', 'effectiveness2' and the
+        resolve_battles 'outcome' for the played matches only.
+    """
+    played = second != BYE
+    a, b = first[played], second[played]
+    effectiveness1 = effectiveness_batch(type_combos[a], type_combos[b])
+    effectiveness2 = effectiveness_batch(type_combos[b], type_combos[a])
+    outcome = resolve_battles(scores[a], scores[b], effectiveness1, effectiveness2, rng)
+    winner = first.copy()
+    winner[played] = np.where(outcome['first_wins'], a, b)
+    return {
+        'winner': winner, 'played': played,
+        'effectiveness1': effectiveness1, 'effectiveness2': effectiveness2, 'outcome': outcome,
+    }
+
+
+def round_robin_schedule(num_entrants):
+    """
+    Circle-method schedule in which everyone meets everyone once.
+
+    Returns:
+        tuple: (first, second) arrays of shape (rounds, pairs). With an odd number
+        of entrants each round has one walkover, with BYE as second.
+    """
+    n = num_entrants + num_entrants % 2
+    if n < 2:
+        return np.zeros((0, 0), dtype=np.int64), np.zeros((0, 0), dtype=np.int64)
+    position = np.arange(n)[None, :]
+    shift = np.arange(n - 1)[:, None]
+    # Entrant 0 stays put; the others rotate one seat per round
+    seats = np.where(position == 0, 0, 1 + (position - 1 + shift) % (n - 1))
+    seats[seats == num_entrants] = BYE  # the padding entrant of an odd field
+    first, second = seats[:, :n // 2], seats[:, ::-1][:, :n // 2]
+    swap = first == BYE
+    return np.where(swap, second, first), np.where(swap, first, second)
+
+
+def standings(scores, first, second, winner, margin, swiss=False):
+    """
+    Ranks entrants from a list of played matches.
+
+    Order: wins, then (Swiss only) Buchholz, the sum of the opponents' wins; then
+    Sonneborn-Berger, the sum of the wins of the opponents beaten; then total score
+    margin; then base battle score. A walkover counts as a win only in Swiss.
+
+    Parameters:
+        scores (ndarray): (N,) battle scores.
+        first, second, winner (ndarray): Every match so far; second is BYE for a walkover.
+        margin (ndarray): first's adjusted score minus second's per match (0 for a walkover).
+        swiss (bool): Count walkovers as wins and use the Buchholz tiebreak.
+
+    Returns:
+        dict: Per-entrant arrays 'wins', 'losses', 'byes', 'buchholz', 'sonneborn_berger',
+        'margin' and 'rank' (1 = first), plus 'order', the entrant indices best first.
+    """
+    num_entrants = len(scores)
+    played = second != BYE
+    a, b, won = first[played], second[played], winner[played]
+    lost = np.where(won == a, b, a)
+
+    def total(index, weights=None):
+        return np.bincount(index, weights=weights, minlength=num_entrants)
+
+    byes = total(first[~played]).astype(np.int64)
+    wins = total(won).astype(np.int64) + (byes if swiss else 0)
+    buchholz = total(a, wins[b]) + total(b, wins[a]) if swiss else np.zeros(num_entrants)
+    sonneborn_berger = total(won, wins[lost])
+    net_margin = total(a, margin[played]) - total(b, margin[played])
+
+    order = np.lexsort((np.arange(num_entrants), -scores, -net_margin, -sonneborn_berger, -buchholz, -wins))
+    rank = np.empty(num_entrants, dtype=np.int64)
+    rank[order] = np.arange(1, num_entrants + 1)
+    return {
+        'order': order,
+        'rank': rank,
+        'wins': wins,
+        'losses': total(lost).astype(np.int64),
+        'byes': byes,
+        'buchholz': buchholz,
+        'sonneborn_berger': sonneborn_berger,
+        'margin': net_margin,
+    }
+
+
+def _margins(result):
+    """first's adjusted score minus second's per match, 0 for walkovers."""
+    margin = np.zeros(len(result['winner']))
+    outcome = result['outcome']
+    margin[result['played']] = outcome['adjusted_score1'] - outcome['adjusted_score2']
+    return margin
+
+
+def _log_rounds(log, round_numbers, first, second, scores, result):
+    """Appends batched matches to a BattleLog one round at a time (matches ordered by round)."""
+    played = result['played']
+    outcome_index = np.cumsum(played) - played  # position of each played match in the outcome arrays
+    for round_number in np.unique(round_numbers):
+        rows = np.flatnonzero(round_numbers == round_number)
+        fought = outcome_index[rows[played[rows]]]
+        log.append(int(round_number), match_record(
+            first[rows], second[rows], result['winner'][rows], played[rows], scores,
+            result['effectiveness1'][fought], result['effectiveness2'][fought],
+            {key: values[fought] for key, values in result['outcome'].items()}, log.full
+        ))
+
+
+def simulate_round_robin(scores, type_combos, rng, log=None):
+    """
+    Plays a full round robin, all N(N-1)/2 battles in one batched operation.
+
+    Parameters:
+        scores (ndarray): (N,) battle scores.
+        type_combos (ndarray): (N,) type combos.
+        rng (numpy.random.Generator): Source of all battle randomness.
+        log (BattleLog): Optional log; receives the matches round by round of the circle schedule.
+
+    Returns:
+        dict: The final standings (see standings()).
+    """
+    first, second = round_robin_schedule(len(scores))
+    round_numbers = np.repeat(np.arange(1, len(first) + 1), first.shape[1] if first.size else 0)
+    first, second = first.ravel(), second.ravel()
+    result = play_matches(scores, type_combos, first, second, rng)
+    if log is not None:
+        _log_rounds(log, round_numbers, first, second, scores, result)
+    return standings(scores, first, second, result['winner'], _margins(result))
+
+
+def swiss_pairings(order, met, had_bye):
+    """
+    Pairs entrants down the standings, each with the next one it has not met yet.
+
+    Parameters:
+        order (ndarray): Entrant indices, best first.
+        met (set): Pairs already played, as (low index, high index) tuples.
+        had_bye (ndarray): Boolean per entrant; with an odd field the lowest-ranked
+            entrant without a bye gets this round's.
+
+    Returns:
+        tuple: (first, second) arrays, with a walkover as (entrant, BYE) at the end.
+    """
+    waiting = [int(i) for i in order]
+    bye = None
+    if len(waiting) % 2:
+        bye = next((i for i in reversed(waiting) if not had_bye[i]), waiting[-1])
+        waiting.remove(bye)
+    first, second = [], []
+    while waiting:
+        i = waiting.pop(0)
+        # Fall back to a rematch only when everyone left has already been met
+        k = next((k for k, j in enumerate(waiting) if (min(i, j), max(i, j)) not in met), 0)
+        first.append(i)
+        second.append(waiting.pop(k))
+    if bye is not None:
+        first.append(bye)
+        second.append(BYE)
+    return np.array(first, dtype=np.int64), np.array(second, dtype=np.int64)
+
+
+def simulate_swiss(scores, type_combos, rng, rounds=None, log=None, on_round=None):
+    """
+    Plays a Swiss-system tournament: each round pairs entrants with similar records.
+
+    Round one pairs by base score; every round is a single batched operation.
+
+    Parameters:
+        scores (ndarray): (N,) battle scores.
+        type_combos (ndarray): (N,) type combos.
+        rng (numpy.random.Generator): Source of all battle randomness.
+        rounds (int): Number of rounds; defaults to as many as a single-elimination bracket.
+        log (BattleLog): Optional log that receives every match, walkovers included.
+        on_round (callable): Called as on_round(round_number, standings) after each round.
+
+    Returns:
+        dict: The final standings (see standings()).
+    """
+    num_entrants = len(scores)
+    rounds = num_rounds(num_entrants) if rounds is None else rounds
+    empty = np.zeros(0, dtype=np.int64)
+    firsts, seconds, winners, margins = [empty], [empty], [empty], [np.zeros(0)]
+    met = set()
+    current = standings(scores, empty, empty, empty, np.zeros(0), swiss=True)
+    for round_number in range(1, rounds + 1):
+        first, second = swiss_pairings(current['order'], met, current['byes'] > 0)
+        result = play_matches(scores, type_combos, first, second, rng)
+        if log is not None:
+            _log_rounds(log, np.full(len(first), round_number), first, second, scores, result)
+        met.update((min(i, j), max(i, j)) for i, j in zip(first.tolist(), second.tolist()) if j != BYE)
+        firsts.append(first)
+        seconds.append(second)
+        winners.append(result['winner'])
+        margins.append(_margins(result))
+        current = standings(
+            scores, np.concatenate(firsts), np.concatenate(seconds), np.concatenate(winners),
+            np.concatenate(margins), swiss=True
+        )
+        if on_round is not None:
+            on_round(round_number, current)
+    return current
+
+
+def play_tournament(system, scores, type_combos, rng, log=None, on_round=None):
+    """
+    Plays one tournament in any of FORMATS.
+
+    on_round receives the advancing entrants in single elimination, the standings
+    in Swiss, and is not called for a round robin (played in one batch).
+
+    Returns:
+        tuple: (champion roster index, final standings or None for single elimination).
+    """
+    if system == SINGLE_ELIMINATION:
+        return simulate_bracket(scores, type_combos, rng, log, on_round), None
+    if system == ROUND_ROBIN:
+        final = simulate_round_robin(scores, type_combos, rng, log)
+    elif system == SWISS:
+        final = simulate_swiss(scores, type_combos, rng, log=log, on_round=on_round)
+    else:
+        raise ValueError(f"Unknown tournament format {system!r}; expected one of {FORMATS}.")
+    return int(final['order'][0]), final
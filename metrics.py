@@ -0,0 +1,146 @@
+# metrics.py
+
+import cProfile
+import functools
+import io
+import os
+import pstats
+import tempfile
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+import numpy as np
+
+ENABLED = os.environ.get("POKEMON_METRICS") == "1"  # off by default; instrumented calls then skip all bookkeeping
+MAX_SAMPLES = 4096  # latest timings kept per metric for the percentiles
+PERCENTILES = (50, 90, 99)
+PROFILE_LINES = 40  # functions listed in a profile report
+
+_timings = {}
+_counters = {}
+_lock = threading.Lock()
+
+
+def set_enabled(enabled):
+    """Turns metric collection on or off for the whole process."""
+    global ENABLED
+    ENABLED = enabled
+
+
+def reset():
+    """Drops every recorded timing and counter."""
+    with _lock:
+        _timings.clear()
+        _counters.clear()
+
+
+def record(name, seconds):
+    """Adds one timing sample to a metric."""
+    with _lock:
+        timing = _timings.get(name)
+        if timing is None:
+            timing = _timings[name] = {'count': 0, 'total': 0.0, 'samples': deque(maxlen=MAX_SAMPLES)}
+        timing['count'] += 1
+        timing['total'] += seconds
+        timing['samples'].append(seconds)
+
+
+def increment(name, amount=1):
+    """Bumps a counter, if metrics are enabled."""
+    if ENABLED:
+        with _lock:
+            _counters[name] = _counters.get(name, 0) + amount
+
+
+def timed(name):
+    """
+    Decorator recording the wall time of every call under name.
+
+    Disabled, the only overhead is the wrapper call and one flag check.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not ENABLED:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                record(name, time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+
+@contextmanager
+def timer(name):
+    """Context-manager counterpart of timed, for a block of code."""
+    if not ENABLED:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(name, time.perf_counter() - start)
+
+
+def snapshot():
+    """
+    Summary of every timed metric.
+
+    Returns:
+        list: One dict per metric with 'name', 'count', 'total_ms', 'max_ms' and a
+        'p50_ms'/'p90_ms'/'p99_ms' entry per percentile (over the last MAX_SAMPLES calls).
+    """
+    with _lock:
+        timings = [(name, timing['count'], timing['total'], np.array(timing['samples']))
+                   for name, timing in sorted(_timings.items())]
+    rows = []
+    for name, count, total, samples in timings:
+        row = {'name': name, 'count': count, 'total_ms': 1e3 * total, 'max_ms': 1e3 * samples.max()}
+        for percentile, value in zip(PERCENTILES, np.percentile(samples, PERCENTILES)):
+            row[f'p{percentile}_ms'] = 1e3 * value
+        rows.append(row)
+    return rows
+
+
+def counters():
+    """Current value of every counter."""
+    with _lock:
+        return dict(sorted(_counters.items()))
+
+
+class Profile:
+    """Result of a profiled() block: a text report and the raw pstats data."""
+
+    def __init__(self):
+        self.report = ''
+        self.data = b''
+
+
+@contextmanager
+def profiled(sort='cumulative'):
+    """
+    Runs the block under cProfile.
+
+    Yields a Profile that is filled in when the block exits: report holds the
+    top PROFILE_LINES functions as text, data the .prof file (for pstats or snakeviz).
+    """
+    profile = Profile()
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield profile
+    finally:
+        profiler.disable()
+        report = io.StringIO()
+        pstats.Stats(profiler, stream=report).sort_stats(sort).print_stats(PROFILE_LINES)
+        profile.report = report.getvalue()
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'profile.prof')
+            profiler.dump_stats(path)
+            with open(path, 'rb') as f:
+                profile.data = f.read()
@@ -0,0 +1,99 @@
+# mock_pokeapi.py
+
+import argparse
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from pokemon import STAT_NAMES
+from type_chart import type_chart
+
+SPRITE_URL = "https://raw.githubusercontent.com/PokeAPI/sprites/master/sprites/pokemon/{}.png"
+PATH_PATTERN = re.compile(r"^/api/v2/pokemon/(\d+)/?$")
+
+
+def fake_pokemon_data(pokemon_id):
+    """Builds a deterministic PokeAPI-shaped payload for the given ID."""
+    rng = random.Random(pokemon_id)
+    types = rng.sample(sorted(type_chart), rng.choice([1, 2]))
+    return {
+        'name': f"mon{pokemon_id}",
+        'id': pokemon_id,
+        'types': [{'slot': i + 1, 'type': {'name': t}} for i, t in enumerate(types)],
+        'stats': [{'base_stat': rng.randint(20, 150), 'stat': {'name': s}} for s in STAT_NAMES],
+        'sprites': {'front_default': SPRITE_URL.format(pokemon_id)},
+    }
+
+
+class MockPokeAPIHandler(BaseHTTPRequestHandler):
+    """Serves fake Pokémon payloads with optional latency and failures."""
+
+    protocol_version = "HTTP/1.1"  # keep-alive, like the real API
+
+    def do_GET(self):
+        server = self.server
+        with server.stats_lock:
+            server.request_count += 1
+        if server.latency:
+            time.sleep(server.latency)
+
+        match = PATH_PATTERN.match(self.path)
+        pokemon_id = int(match.group(1)) if match else None
+        if pokemon_id is None or pokemon_id > server.max_pokemon_id:
+            self._send(404, b'Not Found')
+        elif pokemon_id in server.fail_ids:
+            self._send(500, b'Internal Server Error')
+        else:
+            self._send(200, json.dumps(fake_pokemon_data(pokemon_id)).encode(), 'application/json')
+
+    def _send(self, status, body, content_type='text/plain'):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_server(port=0, latency=0.0, fail_ids=(), max_pokemon_id=1025):
+    """
+    Starts the stand-in server on a background thread.
+
+    Returns:
+        tuple: The server (call .shutdown() when done) and the base URL to pass to api.
+    """
+    server = ThreadingHTTPServer(('127.0.0.1', port), MockPokeAPIHandler)
+    server.daemon_threads = True
+    server.latency = latency
+    server.fail_ids = set(fail_ids)
+    server.max_pokemon_id = max_pokemon_id
+    server.request_count = 0
+    server.stats_lock = threading.Lock()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}/api/v2/pokemon/"
+    return server, base_url
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in for the PokeAPI pokemon endpoint.")
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--latency', type=float, default=0.0, help="Seconds to delay every response.")
+    parser.add_argument('--max-id', type=int, default=1025)
+    args = parser.parse_args()
+
+    server, base_url = start_server(args.port, args.latency, max_pokemon_id=args.max_id)
+    print(f"Serving fake PokeAPI at {base_url} (set POKEAPI_BASE_URL to use it)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+# montecarlo.py
+
+import numpy as np
+
+import seeding
+from battle import resolve_battles
+from battle_log import BYE
+from parallel import map_shards, shard_sizes, spawn_seeds
+from tournament import bracket_layout, bracket_size, num_rounds
+from type_chart import effectiveness_batch
+
+DEFAULT_SIMULATIONS = 100_000
+SHARD_SIZE = 50_000  # most tournaments simulated together with one RNG stream
+SHARD_ELEMENTS = 2 ** 21  # bracket slots (tournaments x bracket size) per shard; bounds peak memory per process
+MAX_SIMULATED_ENTRANTS = 256  # beyond this the app only offers exact odds, which stay cheap
+Z_95 = 1.959964
+
+
+def simulate_bracket_batch(scores, type_combos, num_tournaments, rng):
+    """
+    Plays the same bracket num_tournaments times at once.
+
+    Uses the same bracket_layout as tournament.simulate_bracket, byes included.
+
+    Returns:
+        ndarray: (num_rounds, N) counts of how often each entrant won each round.
+    """
+    num_entrants = len(scores)
+    wins = np.zeros((num_rounds(num_entrants), num_entrants), dtype=np.int64)
+    alive = np.tile(bracket_layout(num_entrants), (num_tournaments, 1))
+    round_index = 0
+    while alive.shape[1] > 1:
+        first, second = alive[:, 0::2], alive[:, 1::2]
+        played = second != BYE
+        opponent = np.where(played, second, first)  # walkovers play themselves; the result is discarded
+        outcome = resolve_battles(
+            scores[first], scores[opponent],
+            effectiveness_batch(type_combos[first], type_combos[opponent]),
+            effectiveness_batch(type_combos[opponent], type_combos[first]),
+            rng,
+        )
+        alive = np.where(outcome['first_wins'] | ~played, first, second)
+        wins[round_index] = np.bincount(alive.ravel(), minlength=num_entrants)
+        round_index += 1
+    return wins
+
+
+def shard_size(num_entrants):
+    """Tournaments per shard: SHARD_SIZE, fewer for large brackets so a shard stays within SHARD_ELEMENTS."""
+    return max(1, min(SHARD_SIZE, SHARD_ELEMENTS // bracket_size(num_entrants)))
+
+
+def _simulate_shard(scores, type_combos, num_tournaments, seed_sequence):
+    """Process-pool entry point: plays one shard of tournaments on its own RNG stream."""
+    return simulate_bracket_batch(scores, type_combos, num_tournaments, seeding.generator(seed_sequence))
+
+
+def wilson_interval(successes, trials, z=Z_95):
+    """Wilson score confidence interval for a binomial proportion (arrays welcome)."""
+    p = successes / trials
+    denominator = 1 + z ** 2 / trials
+    centre = (p + z ** 2 / (2 * trials)) / denominator
+    margin = z * np.sqrt(p * (1 - p) / trials + z ** 2 / (4 * trials ** 2)) / denominator
+    return centre - margin, centre + margin
+
+
+def simulate_championship_odds(roster, weights, num_simulations=DEFAULT_SIMULATIONS, seed=None, workers=1):
+    """
+    Estimates every entrant's odds by replaying the bracket many times.
+
+    The tournaments are split into shards of shard_size(N), each with its own
+    RNG stream spawned from the seed, and the per-shard win counts are summed.
+
+    Parameters:
+        roster (Roster): The entrants, in bracket order.
+        weights (dict): Stat weights used for battle scores.
+        num_simulations (int): Number of tournaments to play.
+        seed (int): Root seed; the same seed reproduces the same odds for any number of workers.
+        workers (int): Processes to spread the shards over; 1 runs them in this process,
+            None uses every core.
+
+    Returns:
+        dict: 'num_simulations'; 'seed', the root seed used; 'round_survival', a (rounds, N) array with the
+        probability of winning each round; 'champion_probability' (its last
+        row); and 'champion_ci_low'/'champion_ci_high', 95% Wilson bounds.
+    """
+    scores = roster.scores(weights)
+    seed = seed if seed is not None else seeding.new_seed()
+    sizes = shard_sizes(num_simulations, shard_size(len(roster)))
+    shard_seeds = spawn_seeds(seeding.seed_sequence(seed, seeding.ODDS_STREAM), len(sizes))
+    shards = [(scores, roster.type_combos, size, shard_seed) for size, shard_seed in zip(sizes, shard_seeds)]
+    wins = sum(map_shards(_simulate_shard, shards, workers))
+
+    round_survival = wins / num_simulations
+    champion_wins = wins[-1] if len(wins) else np.ones(len(roster), dtype=np.int64) * num_simulations
+    ci_low, ci_high = wilson_interval(champion_wins, num_simulations)
+    return {
+        'num_simulations': num_simulations,
+        'seed': seed,
+        'round_survival': round_survival,
+        'champion_probability': champion_wins / num_simulations,
+        'champion_ci_low': ci_low,
+        'champion_ci_high': ci_high,
+    }
@@ -0,0 +1,150 @@
+# odds.py
+
+import numpy as np
+
+from battle import CRITICAL_HIT_CHANCE, CRITICAL_HIT_MULTIPLIER, RANDOMNESS_RANGE
+from battle_log import BYE
+from tournament import bracket_layout
+from type_chart import effectiveness_batch
+
+# (probability, multiplier) of the critical-hit outcomes
+_CRITICAL_OUTCOMES = ((CRITICAL_HIT_CHANCE, CRITICAL_HIT_MULTIPLIER), (1 - CRITICAL_HIT_CHANCE, 1.0))
+
+
+def _ratio_outcomes():
+    """(probability, ratio) of side 1's critical-hit multiplier over side 2's, equal ratios merged."""
+    outcomes = {}
+    for p1, crit1 in _CRITICAL_OUTCOMES:
+        for p2, crit2 in _CRITICAL_OUTCOMES:
+            outcomes[crit1 / crit2] = outcomes.get(crit1 / crit2, 0.0) + p1 * p2
+    return tuple((p, ratio) for ratio, p in outcomes.items())
+
+
+_RATIO_OUTCOMES = _ratio_outcomes()
+
+
+def _uniform_ratio_win(k):
+    """
+    P(k * U1 > U2) for independent U1, U2 ~ uniform(RANDOMNESS_RANGE).
+
+    k is a non-negative array of ratios, inf allowed. Outside
+    [low / high, high / low] the answer is 0 or 1, which the clipped
+    ratio gives exactly.
+    """
+    low, high = RANDOMNESS_RANGE
+    width = high - low
+    k = np.clip(k, low / high, high / low)
+    # P(U2 < k U1) = (1 / width^2) * integral over u1 of clamp(k u1 - low, 0, width)
+    lo = np.clip(low / k, low, high)
+    hi = np.clip(high / k, low, high)
+    ramp = k / 2 * (hi ** 2 - lo ** 2) - low * (hi - lo)
+    return np.clip((ramp + width * (high - hi)) / width ** 2, 0.0, 1.0)
+
+
+def win_probability(score1, effectiveness1, score2, effectiveness2):
+    """
+    Exact probability that side 1 wins battle_pokemon, for broadcastable arrays.
+
+    The battle compares score * effectiveness * randomness * critical hit on
+    both sides; conditioning on the critical-hit outcomes leaves the ratio of
+    two uniforms, which has a closed form. Only the ratio of the two sides
+    matters, and equal crit ratios (both or neither) are evaluated once. When
+    both sides are 0 the scores always tie, and the coin-flip tie-break gives 0.5.
+    """
+    base1 = np.asarray(score1 * effectiveness1, dtype=np.float64)
+    base2 = np.asarray(score2 * effectiveness2, dtype=np.float64)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        k = base1 / base2
+    p = 0.0
+    for probability, ratio in _RATIO_OUTCOMES:
+        p = p + probability * _uniform_ratio_win(k * ratio)
+    return np.where(np.isnan(k), 0.5, p)
+
+
+def win_probability_matrix(scores, type_combos):
+    """
+    Pairwise win probabilities for a roster.
+
+    Only the pairs above the diagonal are evaluated: P(j beats i) = 1 - P(i beats j),
+    and the diagonal is 0.5.
+
+    Parameters:
+        scores (ndarray): (N,) battle scores, or (K, N) for K weightings at once.
+        type_combos (ndarray): (N,) type combos.
+
+    Returns:
+        ndarray: (..., N, N) matrix whose [i, j] entry is P(i beats j).
+    """
+    num_entrants = len(type_combos)
+    first, second = np.triu_indices(num_entrants, 1)
+    effectiveness1 = effectiveness_batch(type_combos[first], type_combos[second])
+    effectiveness2 = effectiveness_batch(type_combos[second], type_combos[first])
+    scores = np.asarray(scores, dtype=np.float64)
+    upper = win_probability(scores[..., first], effectiveness1, scores[..., second], effectiveness2)
+    matrix = np.full(scores.shape[:-1] + (num_entrants, num_entrants), 0.5)
+    matrix[..., first, second] = upper
+    matrix[..., second, first] = 1 - upper
+    return matrix
+
+
+def bracket_odds(win_matrix):
+    """
+    Exact per-round odds for a single-elimination bracket, by dynamic programming.
+
+    The bracket is tournament.bracket_layout. Each slot covers a contiguous
+    block of entrants (empty for a bye), so for every entrant i in a block,
+
+        P(i wins round r) = P(i reached round r) * sum_j P(j reached round r) * P(i beats j)
+
+    over the j in the opposing block, or just P(i reached round r) against a
+    bye. The whole bracket costs O(N^2 log N).
+
+    Parameters:
+        win_matrix (ndarray): (..., N, N) pairwise win probabilities.
+
+    Returns:
+        ndarray: (..., rounds, N) probability of each entrant winning each round;
+        the last row is the championship probability.
+    """
+    num_entrants = win_matrix.shape[-1]
+    blocks = []
+    for slot in bracket_layout(num_entrants):
+        start = blocks[-1][1] if blocks else 0
+        blocks.append((start, start + int(slot != BYE)))
+
+    reach = np.ones(win_matrix.shape[:-1])
+    rounds = []
+    while len(blocks) > 1:
+        next_reach = reach.copy()
+        for (a0, a1), (b0, b1) in zip(blocks[0::2], blocks[1::2]):
+            if a0 == a1 or b0 == b1:
+                continue  # walkover: the occupant of the other block advances for sure
+            left, right = reach[..., a0:a1], reach[..., b0:b1]
+            next_reach[..., a0:a1] = left * np.einsum('...ij,...j->...i', win_matrix[..., a0:a1, b0:b1], right)
+            next_reach[..., b0:b1] = right * np.einsum('...ij,...j->...i', win_matrix[..., b0:b1, a0:a1], left)
+        blocks = [(a0, b1) for (a0, _), (_, b1) in zip(blocks[0::2], blocks[1::2])]
+        reach = next_reach
+        rounds.append(reach)
+    if not rounds:
+        return np.ones(win_matrix.shape[:-2] + (0, num_entrants))
+    return np.stack(rounds, axis=-2)
+
+
+def exact_championship_odds(roster, weights):
+    """
+    Exact counterpart of montecarlo.simulate_championship_odds.
+
+    Returns:
+        dict: 'win_matrix' (N, N), 'round_survival' (rounds, N) and 'champion_probability' (N,).
+    """
+    return odds_from_win_matrix(win_probability_matrix(roster.scores(weights), roster.type_combos))
+
+
+def odds_from_win_matrix(win_matrix):
+    """Bracket odds for a precomputed (N, N) win matrix, in exact_championship_odds' format."""
+    round_survival = bracket_odds(win_matrix)
+    return {
+        'win_matrix': win_matrix,
+        'round_survival': round_survival,
+        'champion_probability': round_survival[-1] if len(round_survival) else np.ones(win_matrix.shape[-1]),
+    }
@@ -0,0 +1,213 @@
+# optimizer.py
+
+import time
+
+import numpy as np
+
+import metrics
+import seeding
+from odds import bracket_odds, win_probability_matrix
+from pokemon import DEFAULT_WEIGHTS, STAT_NAMES, WEIGHT_BOUNDS, WEIGHT_STEP, weight_vector
+
+ADAPTIVE = 'Adaptive'  # cross-entropy method: a diagonal Gaussian refitted to the best candidates
+RANDOM = 'Random'
+GRID = 'Grid'
+METHODS = [ADAPTIVE, RANDOM, GRID]
+DEFAULT_BUDGET = 4096  # weight vectors evaluated per search
+POPULATION = 256  # candidates per generation of the adaptive search
+ELITE_FRACTION = 0.125  # share of each generation the next one is fitted to
+POLISH_PASSES = 6  # one-weight-at-a-time moves tried from the best weights the search found
+MATRIX_ELEMENTS = 2 ** 20  # win-matrix entries evaluated at once; bounds peak memory
+SEARCH_ELEMENTS = 2 ** 28  # win-matrix entries one search may evaluate (~10-20 s); caps the budget by N^2
+MAX_ENTRANTS = 256  # larger rosters take seconds per sensitivity sweep alone
+
+LOW = np.array([WEIGHT_BOUNDS[stat][0] for stat in STAT_NAMES])
+HIGH = np.array([WEIGHT_BOUNDS[stat][1] for stat in STAT_NAMES])
+
+
+def snap(vectors):
+    """Rounds (..., 6) weight vectors to the nearest values the sliders can take."""
+    steps = np.round((np.clip(vectors, LOW, HIGH) - LOW) / WEIGHT_STEP)
+    return np.round(np.minimum(LOW + steps * WEIGHT_STEP, HIGH), 10)
+
+
+def target_odds(roster, vectors, target):
+    """
+    Exact single-elimination title odds of one entrant under many weightings.
+
+    Scores, win matrices and bracket odds are all batched over the weight
+    vectors, in chunks of MATRIX_ELEMENTS win-matrix entries; duplicate
+    vectors are evaluated once.
+
+    Parameters:
+        roster (Roster): The entrants, in bracket order.
+        vectors (ndarray): (K, 6) weight vectors aligned with STAT_NAMES.
+        target (int): Roster index of the entrant.
+
+    Returns:
+        ndarray: (K,) championship probabilities.
+    """
+    unique, inverse = np.unique(vectors, axis=0, return_inverse=True)
+    num_entrants = len(roster)
+    if num_entrants < 2:
+        return np.ones(len(vectors))
+    scores = roster.scores(unique)
+    chunk = max(1, MATRIX_ELEMENTS // num_entrants ** 2)
+    probability = np.empty(len(unique))
+    for start in range(0, len(unique), chunk):
+        win_matrix = win_probability_matrix(scores[start:start + chunk], roster.type_combos)
+        probability[start:start + chunk] = bracket_odds(win_matrix)[:, -1, target]
+    return probability[inverse.ravel()]
+
+
+def max_budget(num_entrants):
+    """Largest budget a search over a roster of num_entrants may use (SEARCH_ELEMENTS / N^2)."""
+    return max(POPULATION, SEARCH_ELEMENTS // max(num_entrants, 1) ** 2)
+
+
+def random_candidates(rng, count):
+    """count weight vectors drawn uniformly within the slider bounds."""
+    return snap(rng.uniform(LOW, HIGH, (count, len(STAT_NAMES))))
+
+
+def grid_candidates(budget):
+    """The largest evenly spaced grid over the slider bounds with at most budget points (at least 2 per stat)."""
+    points = max(2, int(np.floor(budget ** (1 / len(STAT_NAMES)) + 1e-9)))
+    axes = [np.linspace(low, high, points) for low, high in zip(LOW, HIGH)]
+    return snap(np.stack(np.meshgrid(*axes, indexing='ij'), axis=-1).reshape(-1, len(STAT_NAMES)))
+
+
+def adaptive_search(evaluate, start, rng, budget, population=POPULATION):
+    """
+    Cross-entropy search: sample a generation from a diagonal Gaussian, keep the
+    best ELITE_FRACTION and refit the Gaussian to them, until the budget is spent.
+    The last (or only) generation shrinks to whatever budget is left.
+
+    Parameters:
+        evaluate (callable): Maps (K, 6) weight vectors to (K,) objective values (higher is better).
+        start (ndarray): (6,) initial mean.
+
+    Returns:
+        tuple: (every candidate evaluated, their values).
+    """
+    mean = np.asarray(start, dtype=np.float64)
+    spread = (HIGH - LOW) / 2
+    elite = max(2, int(population * ELITE_FRACTION))
+    candidates, values = [], []
+    for start in range(0, budget, population):
+        generation = snap(rng.normal(mean, spread, (min(population, budget - start), len(STAT_NAMES))))
+        scores = evaluate(generation)
+        candidates.append(generation)
+        values.append(scores)
+        best = generation[np.argsort(-scores, kind='stable')[:elite]]
+        # Half a slider step keeps the search from collapsing onto one lattice point too early
+        mean, spread = best.mean(axis=0), np.maximum(best.std(axis=0), WEIGHT_STEP / 2)
+    if not candidates:
+        return np.empty((0, len(STAT_NAMES))), np.empty(0)
+    return np.concatenate(candidates), np.concatenate(values)
+
+
+def sensitivity(roster, target, weights):
+    """
+    Title odds as each weight alone sweeps its slider range, the others held at weights.
+
+    Returns:
+        dict: Per stat, {'values': slider values, 'probability': title odds at each}.
+    """
+    base = weight_vector(weights).astype(np.float64)
+    sweeps = []
+    for column, stat in enumerate(STAT_NAMES):
+        values = np.arange(LOW[column], HIGH[column] + WEIGHT_STEP / 2, WEIGHT_STEP)
+        vectors = np.tile(base, (len(values), 1))
+        vectors[:, column] = values
+        vectors = snap(vectors)
+        sweeps.append((stat, vectors[:, column], vectors))
+    probability = target_odds(roster, np.concatenate([vectors for _, _, vectors in sweeps]), target)
+    curves, offset = {}, 0
+    for stat, values, _ in sweeps:
+        curves[stat] = {'values': values, 'probability': probability[offset:offset + len(values)]}
+        offset += len(values)
+    return curves
+
+
+@metrics.timed('optimizer.optimize_weights')
+def optimize_weights(roster, target, method=ADAPTIVE, budget=DEFAULT_BUDGET, start=None, seed=None):
+    """
+    Searches the slider ranges for the weights that maximize one entrant's
+    single-elimination title odds.
+
+    The best weights the search finds are then polished by moving one weight
+    at a time to the best value along its sensitivity curve. Odds depend only
+    on the ratios between weights, so several weightings can tie; the first
+    one found wins. The starting weights are always evaluated, so the result
+    is never worse than them.
+
+    Parameters:
+        roster (Roster): The entrants, in bracket order.
+        target (int): Roster index of the entrant to favour.
+        method (str): One of METHODS.
+        budget (int): Weight vectors to evaluate, capped at max_budget(len(roster)).
+        start (dict): Weights the search starts from (default: DEFAULT_WEIGHTS).
+        seed (int): Root seed of the random and adaptive searches; None draws a fresh one.
+
+    Returns:
+        dict: 'weights' (dict) and 'probability' of the best weighting, 'start_probability',
+        'evaluations', 'seconds', 'evaluations_per_second', the 'sensitivity' curves around
+        the best weights, 'method' and 'seed'.
+
+    Raises:
+        ValueError: On an unknown method, or a roster of more than MAX_ENTRANTS.
+    """
+    if len(roster) > MAX_ENTRANTS:
+        raise ValueError(f"The optimizer handles up to {MAX_ENTRANTS} entrants, not {len(roster)}.")
+    budget = min(budget, max_budget(len(roster)))
+    begin = time.perf_counter()
+    seed = seeding.new_seed() if seed is None else seed
+    rng = seeding.generator(seed, seeding.OPTIMIZER_STREAM)
+    start = snap(weight_vector(start if start is not None else DEFAULT_WEIGHTS).astype(np.float64))
+
+    def evaluate(vectors):
+        return target_odds(roster, vectors, target)
+
+    if method == ADAPTIVE:
+        candidates, values = adaptive_search(evaluate, start, rng, budget - 1)
+    elif method == RANDOM:
+        candidates = random_candidates(rng, budget - 1)
+        values = evaluate(candidates)
+    elif method == GRID:
+        candidates = grid_candidates(budget - 1)
+        values = evaluate(candidates)
+    else:
+        raise ValueError(f"Unknown search method {method!r}; expected one of {METHODS}.")
+
+    start_probability = float(evaluate(start[None])[0])
+    best = int(np.argmax(values)) if len(values) else None
+    if best is None or values[best] <= start_probability:
+        best_vector, best_probability = start.copy(), start_probability
+    else:
+        best_vector, best_probability = candidates[best].copy(), float(values[best])
+    evaluations = len(candidates) + 1
+
+    curves = sensitivity(roster, target, best_vector)
+    evaluations += sum(len(curve['values']) for curve in curves.values())
+    for _ in range(POLISH_PASSES):
+        stat, curve = max(curves.items(), key=lambda item: item[1]['probability'].max())
+        index = int(np.argmax(curve['probability']))
+        if curve['probability'][index] <= best_probability:
+            break
+        best_vector[STAT_NAMES.index(stat)] = curve['values'][index]
+        best_probability = float(curve['probability'][index])
+        curves = sensitivity(roster, target, best_vector)
+        evaluations += sum(len(curve['values']) for curve in curves.values())
+    seconds = time.perf_counter() - begin
+    return {
+        'weights': {stat: float(w) for stat, w in zip(STAT_NAMES, best_vector)},
+        'probability': best_probability,
+        'start_probability': start_probability,
+        'evaluations': evaluations,
+        'seconds': seconds,
+        'evaluations_per_second': evaluations / seconds if seconds > 0 else float('inf'),
+        'sensitivity': curves,
+        'method': method,
+        'seed': seed,
+    }
@@ -0,0 +1,44 @@
+# parallel.py
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+
+def resolve_workers(workers):
+    """Turns a workers setting into a process count: None means every core."""
+    if workers is None:
+        return os.cpu_count() or 1
+    return max(1, int(workers))
+
+
+def shard_sizes(total, shard_size):
+    """Splits total work items into fixed-size shards (the last one may be smaller)."""
+    return [min(shard_size, total - start) for start in range(0, total, shard_size)]
+
+
+def spawn_seeds(seed, num_shards):
+    """
+    Derives one independent seed sequence per shard from a root seed or SeedSequence.
+
+    Shard k always gets the same stream for a given root seed, so results do
+    not depend on how many processes run the shards.
+    """
+    root = seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+    return root.spawn(num_shards)
+
+
+def map_shards(func, shard_args, workers=1):
+    """
+    Runs func(*args) for every shard and returns the results in shard order.
+
+    With workers == 1 the shards run sequentially in this process; otherwise
+    they are spread across a ProcessPoolExecutor. func must be a module-level
+    function so it can be pickled.
+    """
+    workers = min(resolve_workers(workers), len(shard_args))
+    if workers <= 1:
+        return [func(*args) for args in shard_args]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(func, *zip(*shard_args)))
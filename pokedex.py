@@ -0,0 +1,166 @@
+# pokedex.py
+
+import argparse
+import csv
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import numpy as np
+
+from pokemon import STAT_NAMES, Roster
+from type_chart import NO_TYPE, NUM_TYPES, TYPE_IDS, TYPE_NAMES
+
+POKEDEX_PATH = os.environ.get(
+    "POKEDEX_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "pokedex.csv"),
+)
+NATIONAL_DEX_SIZE = 1025
+MISSING_TYPE = -1  # written to the file for a missing second type
+COLUMNS = ['id', 'name'] + STAT_NAMES + ['type1', 'type2', 'sprite']
+
+
+def _to_row(data):
+    """Flattens a PokeAPI payload into a dataset row."""
+    stats = {s['stat']['name']: s['base_stat'] for s in data['stats']}
+    type_ids = [TYPE_IDS.get(t['type']['name'], MISSING_TYPE) for t in data['types']] + [MISSING_TYPE] * 2
+    return (
+        [data['id'], data['name']]
+        + [stats.get(stat, 0) for stat in STAT_NAMES]
+        + type_ids[:2]
+        + [data['sprites']['front_default'] or '']
+    )
+
+
+def preload(max_pokemon_id=NATIONAL_DEX_SIZE, path=POKEDEX_PATH, max_concurrency=None, base_url=None):
+    """
+    Downloads every Pokémon up to max_pokemon_id into the local dataset.
+
+    Rows are appended as each fetch completes, so an interrupted run can be
+    resumed: IDs already present in the file are skipped.
+
+    Returns:
+        int: Number of Pokémon added to the dataset.
+    """
+    import api  # only preloading needs the network stack; loading the dataset stays light
+
+    has_header = os.path.exists(path) and os.path.getsize(path) > 0
+    existing = set()
+    if has_header:
+        with open(path, newline='', encoding='utf-8') as f:
+            existing = {int(row['id']) for row in csv.DictReader(f)}
+    missing = [i for i in range(1, max_pokemon_id + 1) if i not in existing]
+    if not missing:
+        return 0
+
+    added = 0
+    with open(path, 'a', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        if not has_header:  # a run interrupted before its first row still left the header
+            writer.writerow(COLUMNS)
+
+        def fetch(pokemon_id):
+            return api.get_pokemon_data(pokemon_id, base_url=base_url, rate_limiter=api.default_rate_limiter)
+
+        with ThreadPoolExecutor(max_workers=max_concurrency or api.MAX_CONCURRENCY) as executor:
+            futures = [executor.submit(fetch, pokemon_id) for pokemon_id in missing]
+            for future in as_completed(futures):
+                data = future.result()
+                if not data:
+                    continue
+                writer.writerow(_to_row(data))
+                f.flush()
+                added += 1
+                if added % 50 == 0:
+                    print(f"Preloaded {added}/{len(missing)} Pokémon...")
+    return added
+
+
+class Pokedex:
+    """In-memory table of preloaded Pokémon, stored column-wise."""
+
+    def __init__(self, ids, names, stats, type_ids, sprites):
+        self.ids = ids            # (N,) int32
+        self.names = names        # list of N str
+        self.stats = stats        # (N, 6) int16, columns in STAT_NAMES order
+        self.type_ids = type_ids  # (N, 2) int8, MISSING_TYPE for a missing second type
+        self.sprites = sprites    # list of N str
+
+    @classmethod
+    def load(cls, path=POKEDEX_PATH):
+        """Loads the dataset written by preload(), sorted by ID."""
+        with open(path, newline='', encoding='utf-8') as f:
+            rows = sorted(csv.DictReader(f), key=lambda row: int(row['id']))
+        return cls(
+            ids=np.array([int(row['id']) for row in rows], dtype=np.int32),
+            names=[row['name'] for row in rows],
+            stats=np.array([[int(row[stat]) for stat in STAT_NAMES] for row in rows], dtype=np.int16).reshape(-1, 6),
+            type_ids=np.array([[int(row['type1']), int(row['type2'])] for row in rows], dtype=np.int8).reshape(-1, 2),
+            sprites=[row['sprite'] or None for row in rows],
+        )
+
+    @classmethod
+    def load_if_available(cls, path=POKEDEX_PATH):
+        """Returns the loaded dataset, or None if it has not been preloaded."""
+        return cls.load(path) if os.path.exists(path) else None
+
+    def __len__(self):
+        return len(self.ids)
+
+    @property
+    def max_pokemon_id(self):
+        return int(self.ids[-1]) if len(self.ids) else 0
+
+    @property
+    def type_combos(self):
+        """Type combo index of every row, as used by type_chart.COMBO_MATRIX."""
+        type_ids = np.where(self.type_ids == MISSING_TYPE, NO_TYPE, self.type_ids).astype(np.int64)
+        return type_ids[:, 0] * (NUM_TYPES + 1) + type_ids[:, 1]
+
+    def roster(self, indices=None):
+        """Builds a Roster straight from the table's columns, without creating Pokemon objects."""
+        indices = np.arange(len(self.ids)) if indices is None else np.asarray(indices)
+        return Roster(self.ids[indices], self.stats[indices], self.type_combos[indices])
+
+    def payload(self, index):
+        """Rebuilds the PokeAPI-shaped payload for the row at index."""
+        return {
+            'name': self.names[index],
+            'id': int(self.ids[index]),
+            'types': [{'type': {'name': TYPE_NAMES[t]}} for t in self.type_ids[index] if t != MISSING_TYPE],
+            'stats': [
+                {'stat': {'name': stat}, 'base_stat': int(value)}
+                for stat, value in zip(STAT_NAMES, self.stats[index])
+            ],
+            'sprites': {'front_default': self.sprites[index]},
+        }
+
+    def sample_indices(self, num_pokemons, max_pokemon_id=None, rng=None):
+        """
+        Row indices of num_pokemons unique Pokémon with ID <= max_pokemon_id, in ascending ID order.
+
+        rng is a numpy Generator, e.g. seeding.generator(seed, seeding.ROSTER_STREAM).
+        """
+        rng = rng if rng is not None else np.random.default_rng()
+        eligible = len(self.ids) if max_pokemon_id is None else int(np.searchsorted(self.ids, max_pokemon_id, 'right'))
+        if num_pokemons > eligible:
+            raise ValueError(f"Cannot select {num_pokemons} unique Pokémon from {eligible} preloaded.")
+        # Rows are sorted by ID, so sorted indices give the same roster order as every other source
+        return np.sort(rng.choice(eligible, num_pokemons, replace=False))
+
+    def sample(self, num_pokemons, max_pokemon_id=None, rng=None):
+        """Payloads of sample_indices(...), sorted by Pokédex ID, without any network access."""
+        return [self.payload(int(index)) for index in self.sample_indices(num_pokemons, max_pokemon_id, rng)]
+
+def main():
+    parser = argparse.ArgumentParser(description="Snapshot the Pokédex into a local dataset.")
+    parser.add_argument('--max-id', type=int, default=NATIONAL_DEX_SIZE, help="Highest Pokédex ID to fetch.")
+    parser.add_argument('--path', default=POKEDEX_PATH, help="Dataset file to create or resume.")
+    parser.add_argument('--concurrency', type=int, help="Requests in flight at once (default: api.MAX_CONCURRENCY).")
+    args = parser.parse_args()
+
+    added = preload(args.max_id, args.path, args.concurrency)
+    print(f"Added {added} Pokémon; dataset has {len(Pokedex.load(args.path))} entries at {args.path}")
+
+
+if __name__ == "__main__":
+    main()
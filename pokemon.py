@@ -1,15 +1,79 @@
 # pokemon.py
 
+import numpy as np
+
+from type_chart import type_combo
+
+# PokeAPI stat names, in the order PokeAPI lists them
+STAT_NAMES = ['hp', 'attack', 'defense', 'special-attack', 'special-defense', 'speed']
+
+DEFAULT_WEIGHTS = {
+    'hp': 1.0,
+    'attack': 2.0,
+    'defense': 1.5,
+    'special-attack': 2.0,
+    'special-defense': 1.5,
+    'speed': 1.0
+}
+
+# (low, high) of each weight as the Settings page sliders allow it, and their step
+WEIGHT_BOUNDS = {
+    'hp': (0.5, 2.0),
+    'attack': (1.0, 3.0),
+    'defense': (1.0, 3.0),
+    'special-attack': (1.0, 3.0),
+    'special-defense': (1.0, 3.0),
+    'speed': (0.5, 2.0)
+}
+WEIGHT_STEP = 0.1
+
+
+def add_stat_columns(columns):
+    """
+    Adds per-stat score contributions left to right, in STAT_NAMES order.
+
+    This is get_battle_score's summation order; Roster.scores and
+    scoring.ScoreCache use it too, so a roster scores bit-for-bit the same
+    on every path (app, CLI, battle_pokemon) and so plays the same battles.
+    """
+    columns = iter(columns)
+    total = np.array(next(columns), dtype=np.float64)
+    for column in columns:
+        total += column
+    return total
+
+
+def display_name(name):
+    """A Pokémon's name as shown to users: PokeAPI's lowercase name, capitalized."""
+    return name.capitalize()
+
+
+def weight_vector(weights):
+    """Converts a weights dict into an array aligned with STAT_NAMES (arrays pass through)."""
+    if isinstance(weights, np.ndarray):
+        return weights
+    return np.array([weights.get(stat, 0.0) for stat in STAT_NAMES])
+
+
 class Pokemon:
+    __slots__ = ('name', 'id', 'types', 'base_stats', 'image_url', 'type_combo')
+
     def __init__(self, data):
         """
         Initializes a Pokemon object with data from the PokeAPI.
         """
-        self.name = data['name'].capitalize()
+        self.name = display_name(data['name'])
         self.id = data['id']
-        self.types = [t['type']['name'] for t in data['types']]
-        self.stats = {stat['stat']['name']: stat['base_stat'] for stat in data['stats']}
+        self.types = tuple(t['type']['name'] for t in data['types'])
+        stats = {stat['stat']['name']: stat['base_stat'] for stat in data['stats']}
+        self.base_stats = tuple(stats.get(stat, 0) for stat in STAT_NAMES)
         self.image_url = data['sprites']['front_default']
+        self.type_combo = type_combo(self.types)
+
+    @property
+    def stats(self):
+        """The base stats as a dict keyed by PokeAPI stat name."""
+        return dict(zip(STAT_NAMES, self.base_stats))
 
     def get_battle_score(self, weights):
         """
@@ -22,7 +86,7 @@ class Pokemon:
             float: The calculated battle score.
         """
         total_score = sum(
-            self.stats.get(stat, 0) * weight for stat, weight in weights.items()
+            value * weights.get(stat, 0) for stat, value in zip(STAT_NAMES, self.base_stats)
         )
         return total_score
 
@@ -42,3 +106,50 @@ class Pokemon:
             f"Stats:\n{stats_str}\n"
             + "-" * 40
         )
+
+
+class Roster:
+    """
+    Struct-of-arrays view of a roster for batched scoring and simulation.
+
+    Row i of every array describes the i-th entrant. `pokemons` keeps the
+    Pokemon objects when the roster was built from them, for display.
+    """
+
+    __slots__ = ('ids', 'stats', 'type_combos', 'pokemons')
+
+    def __init__(self, ids, stats, type_combos, pokemons=None):
+        self.ids = np.asarray(ids, dtype=np.int32)
+        self.stats = np.asarray(stats, dtype=np.float64).reshape(-1, len(STAT_NAMES))
+        self.type_combos = np.asarray(type_combos, dtype=np.int64)
+        self.pokemons = pokemons
+
+    @classmethod
+    def from_pokemons(cls, pokemons):
+        """Packs a list of Pokemon objects into contiguous arrays."""
+        pokemons = list(pokemons)
+        return cls(
+            ids=[p.id for p in pokemons],
+            stats=[p.base_stats for p in pokemons],
+            type_combos=[p.type_combo for p in pokemons],
+            pokemons=pokemons,
+        )
+
+    def __len__(self):
+        return len(self.ids)
+
+    def scores(self, weights):
+        """
+        Battle scores of every entrant, one stat column at a time.
+
+        Parameters:
+            weights (dict or ndarray): Stat weights, or a (6,) / (K, 6) array of weight vectors.
+
+        Returns:
+            ndarray: (N,) scores, or (K, N) for K weight vectors, exactly equal
+            to get_battle_score (see add_stat_columns).
+        """
+        vector = np.asarray(weight_vector(weights), dtype=np.float64)
+        return add_stat_columns(
+            self.stats[:, column] * vector[..., column, None] for column in range(len(STAT_NAMES))
+        )
@@ -0,0 +1,203 @@
+# results_store.py
+
+import io
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+from battle_log import BattleLog
+from pokemon import STAT_NAMES, weight_vector
+
+RESULTS_PATH = os.environ.get(
+    "POKEMON_RESULTS_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".pokemon_results.sqlite"),
+)
+DEFAULT_MAX_ENTRIES = 512  # stored tournaments; the least recently used are evicted beyond this
+DECODED_ENTRIES = 8  # decoded records kept in memory, shared by every user of the store
+
+
+def _encode_arrays(arrays):
+    """Compressed .npz bytes of a dict of arrays."""
+    buffer = io.BytesIO()
+    np.savez_compressed(buffer, **arrays)
+    return buffer.getvalue()
+
+
+def _decode_arrays(blob):
+    with np.load(io.BytesIO(blob)) as data:
+        return {name: data[name] for name in data.files}
+
+
+class ResultsStore:
+    """
+    Persistent SQLite store of finished tournaments, shared by every session.
+
+    A tournament is stored as a compact, ID-based record: the roster's Pokédex
+    IDs, the weights, seed and format, the champion's roster index, and the
+    BattleLog and standings columns as compressed arrays (entrants are roster
+    indices, never Pokemon objects). Records are keyed by seeding.tournament_key,
+    so a key identifies the same battles wherever it is reloaded. When more than
+    `max_entries` are stored, the least recently used ones are evicted.
+    """
+
+    def __init__(self, path=RESULTS_PATH, max_entries=DEFAULT_MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.decoded = OrderedDict()
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS tournaments ("
+            " key TEXT PRIMARY KEY,"
+            " system TEXT NOT NULL,"
+            " seed INTEGER NOT NULL,"
+            " weights TEXT NOT NULL,"
+            " roster BLOB NOT NULL,"
+            " champion INTEGER NOT NULL,"
+            " champion_id INTEGER NOT NULL,"
+            " log BLOB NOT NULL,"
+            " standings BLOB,"
+            " created_at REAL NOT NULL,"
+            " accessed_at REAL NOT NULL)"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS tournaments_accessed ON tournaments (accessed_at)")
+
+    def put(self, key, roster_ids, weights, seed, system, champion, log, standings=None):
+        """
+        Stores a finished tournament under its key and evicts LRU records over the cap.
+
+        Parameters:
+            key (str): seeding.tournament_key of (roster_ids, weights, seed, system).
+            roster_ids (sequence): Pokédex IDs of the entrants, in roster order.
+            weights (dict): Stat weights.
+            seed (int): Root seed.
+            system (str): Tournament format.
+            champion (int): Roster index of the champion.
+            log (BattleLog): The battles, entrants as roster indices.
+            standings (dict): Final standings arrays, or None for single elimination.
+        """
+        roster = np.asarray(roster_ids, dtype=np.int32)
+        weights = {stat: float(w) for stat, w in zip(STAT_NAMES, weight_vector(weights))}
+        log_buffer = io.BytesIO()
+        log.to_npz(log_buffer)
+        now = time.time()
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO tournaments (key, system, seed, weights, roster, champion, champion_id,"
+                " log, standings, created_at, accessed_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, system, int(seed), json.dumps(weights), roster.tobytes(), int(champion),
+                 int(roster[champion]), log_buffer.getvalue(),
+                 _encode_arrays(standings) if standings is not None else None, now, now),
+            )
+            self.decoded.pop(key, None)
+            excess = self.conn.execute("SELECT COUNT(*) FROM tournaments").fetchone()[0] - self.max_entries
+            if excess > 0:
+                evicted = [row[0] for row in self.conn.execute(
+                    "SELECT key FROM tournaments ORDER BY accessed_at LIMIT ?", (excess,)
+                )]
+                self.conn.executemany("DELETE FROM tournaments WHERE key = ?", [(k,) for k in evicted])
+                for k in evicted:
+                    self.decoded.pop(k, None)
+                self.evictions += len(evicted)
+        return key
+
+    def get(self, key):
+        """
+        Returns a stored tournament, or None if the key is unknown (or was evicted).
+
+        Returns:
+            dict: 'key', 'system', 'seed', 'weights', 'roster_ids' (ndarray), 'champion'
+            (roster index), 'log' (BattleLog), 'standings' (dict of arrays or None) and
+            'created_at'. Records are shared between callers and must not be modified.
+        """
+        now = time.time()
+        with self.lock:
+            record = self.decoded.get(key)
+            if record is not None:
+                self.decoded.move_to_end(key)
+                self.conn.execute("UPDATE tournaments SET accessed_at = ? WHERE key = ?", (now, key))
+                self.hits += 1
+                return record
+            row = self.conn.execute(
+                "SELECT system, seed, weights, roster, champion, log, standings, created_at"
+                " FROM tournaments WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.conn.execute("UPDATE tournaments SET accessed_at = ? WHERE key = ?", (now, key))
+            self.hits += 1
+        system, seed, weights, roster, champion, log, standings, created_at = row
+        record = {
+            'key': key,
+            'system': system,
+            'seed': seed,
+            'weights': json.loads(weights),
+            'roster_ids': np.frombuffer(roster, dtype=np.int32),
+            'champion': champion,
+            'log': BattleLog.load(io.BytesIO(log)),
+            'standings': _decode_arrays(standings) if standings is not None else None,
+            'created_at': created_at,
+        }
+        with self.lock:
+            self.decoded[key] = record
+            while len(self.decoded) > DECODED_ENTRIES:
+                self.decoded.popitem(last=False)
+        return record
+
+    def __contains__(self, key):
+        """Whether a tournament is stored under key, without touching the counters or LRU order."""
+        with self.lock:
+            return self.conn.execute("SELECT 1 FROM tournaments WHERE key = ?", (key,)).fetchone() is not None
+
+    def summaries(self, keys):
+        """
+        Metadata of the stored tournaments among keys, in the order given; unknown keys are skipped.
+
+        Returns:
+            list: One dict per tournament with 'key', 'system', 'seed', 'entrants',
+            'champion_id' and 'created_at'.
+        """
+        keys = list(keys)
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT key, system, seed, length(roster) / 4, champion_id, created_at"
+                f" FROM tournaments WHERE key IN ({', '.join('?' * len(keys))})", keys
+            ).fetchall()
+        names = ['key', 'system', 'seed', 'entrants', 'champion_id', 'created_at']
+        found = {row[0]: dict(zip(names, row)) for row in rows}
+        return [found[key] for key in keys if key in found]
+
+    def clear(self):
+        """Removes every record and resets the counters."""
+        with self.lock:
+            self.conn.execute("DELETE FROM tournaments")
+            self.decoded.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self):
+        """Returns hit/miss counters, the number of stored tournaments and their size on disk."""
+        with self.lock:
+            size, stored_bytes = self.conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(length(roster) + length(log) + COALESCE(length(standings), 0)), 0)"
+                " FROM tournaments"
+            ).fetchone()
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'size': size,
+            'stored_kb': stored_bytes / 1024,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+        }
@@ -0,0 +1,114 @@
+# scoring.py
+
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from analytics import roster_analytics
+from odds import odds_from_win_matrix, win_probability_matrix
+from pokemon import add_stat_columns, weight_vector
+
+MATCHUP_CACHE_ENTRIES = 16  # weightings whose matchup tables are kept
+MATCHUP_CACHE_BYTES = 32 * 2 ** 20  # ...as long as their arrays fit in this; the latest is always kept
+
+
+def weights_fingerprint(weights):
+    """Hashable key for a weighting, independent of dict order."""
+    return tuple(float(w) for w in weight_vector(weights))
+
+
+def _table_bytes(value, seen):
+    """Bytes held by the arrays in a (nested) matchup table, each array counted once."""
+    if isinstance(value, np.ndarray):
+        if id(value) in seen:
+            return 0
+        seen.add(id(value))
+        return value.nbytes
+    if isinstance(value, dict):
+        return sum(_table_bytes(item, seen) for item in value.values())
+    return 0
+
+
+class ScoreCache:
+    """
+    Battle scores and pairwise matchup tables for one roster, memoized on the weights.
+
+    Scores are kept as per-stat contributions, so a weight change only
+    recomputes the columns of the stats whose weight moved. Matchup tables
+    (win matrix, exact bracket odds, roster analytics) are built lazily the
+    first time a weighting asks for them and kept for the
+    MATCHUP_CACHE_ENTRIES most recent weightings, fewer when their arrays
+    would exceed MATCHUP_CACHE_BYTES (an N x N table grows fast with N).
+    One cache can be shared by every session on a roster: calls are
+    serialized by a lock, and returned arrays are never modified afterwards.
+    """
+
+    def __init__(self, roster):
+        self.roster = roster
+        self.weights = np.full(roster.stats.shape[1], np.nan)
+        self.contributions = np.zeros_like(roster.stats)
+        self.fingerprint = None
+        self.columns_recomputed = 0
+        self._scores = None
+        self._matchups = OrderedDict()
+        self.lock = threading.RLock()
+
+    def scores(self, weights):
+        """(N,) battle scores under the given weights."""
+        vector = np.asarray(weight_vector(weights), dtype=np.float64)
+        with self.lock:
+            changed = np.flatnonzero(vector != self.weights)  # NaN start: every column on first use
+            if len(changed):
+                self.contributions[:, changed] = self.roster.stats[:, changed] * vector[changed]
+                self.weights = vector.copy()
+                self.fingerprint = weights_fingerprint(vector)
+                self._scores = add_stat_columns(self.contributions.T)
+                self.columns_recomputed += len(changed)
+            return self._scores
+
+    def _matchup_entry(self, weights):
+        with self.lock:
+            scores = self.scores(weights)
+            entry = self._matchups.get(self.fingerprint)
+            if entry is None:
+                entry = {'win_matrix': win_probability_matrix(scores, self.roster.type_combos)}
+                self._matchups[self.fingerprint] = entry
+            self._matchups.move_to_end(self.fingerprint)
+            self._evict()
+            return entry
+
+    def _evict(self):
+        """Drops the least recently used matchup tables over the entry or byte budget."""
+        while len(self._matchups) > 1 and (
+            len(self._matchups) > MATCHUP_CACHE_ENTRIES or self.matchup_bytes() > MATCHUP_CACHE_BYTES
+        ):
+            self._matchups.popitem(last=False)
+
+    def matchup_bytes(self):
+        """Bytes held by the cached matchup tables."""
+        seen = set()
+        with self.lock:
+            return sum(_table_bytes(entry, seen) for entry in self._matchups.values())
+
+    def win_matrix(self, weights):
+        """(N, N) pairwise win probabilities under the given weights."""
+        return self._matchup_entry(weights)['win_matrix']
+
+    def exact_odds(self, weights):
+        """odds.exact_championship_odds for the given weights, from the cached win matrix."""
+        with self.lock:
+            entry = self._matchup_entry(weights)
+            if 'odds' not in entry:
+                entry['odds'] = odds_from_win_matrix(entry['win_matrix'])
+                self._evict()
+            return entry['odds']
+
+    def analytics(self, weights):
+        """analytics.roster_analytics for the given weights, from the cached win matrix."""
+        with self.lock:
+            entry = self._matchup_entry(weights)
+            if 'analytics' not in entry:
+                entry['analytics'] = roster_analytics(self._scores, self.roster.type_combos, entry['win_matrix'])
+                self._evict()
+            return entry['analytics']
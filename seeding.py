@@ -0,0 +1,57 @@
+# seeding.py
+
+import hashlib
+import json
+
+import numpy as np
+
+from pokemon import weight_vector
+
+# Independent streams derived from one root seed, so e.g. drawing a different
+# roster never shifts the battle randomness of the same seed
+ROSTER_STREAM = 0  # which Pokémon are drawn
+BATTLE_STREAM = 1  # randomness, critical-hit and tie-break draws of the tournament itself
+ODDS_STREAM = 2    # Monte Carlo championship odds
+OPTIMIZER_STREAM = 3  # weight-optimizer search
+MAX_SEED = 2 ** 53 - 1  # seeds stay exact as JavaScript numbers, e.g. in a Streamlit number_input
+
+
+def new_seed():
+    """A fresh root seed from OS entropy; store it to reproduce what it drives."""
+    return int(np.random.SeedSequence().generate_state(1, np.uint64)[0] & np.uint64(MAX_SEED))
+
+
+def seed_sequence(seed, stream):
+    """
+    The SeedSequence of one stream of a root seed.
+
+    Spawn further independent children from it (e.g. one per shard) with .spawn(n).
+    """
+    return np.random.SeedSequence(int(seed), spawn_key=(stream,))
+
+
+def generator(seed, stream=BATTLE_STREAM):
+    """
+    A numpy Generator for one stream of a root seed, or for a SeedSequence.
+
+    The same (seed, stream) always yields the same draws, in any process.
+    """
+    sequence = seed if isinstance(seed, np.random.SeedSequence) else seed_sequence(seed, stream)
+    return np.random.Generator(np.random.PCG64(sequence))
+
+
+def tournament_key(roster_ids, weights, seed, system):
+    """
+    Short stable identifier of a tournament.
+
+    (roster, weights, seed, format) fully determine every battle, so equal
+    keys mean identical results: they can be cached by key and replayed
+    from the key alone.
+    """
+    description = {
+        'roster': [int(i) for i in roster_ids],
+        'weights': [round(float(w), 9) for w in weight_vector(weights)],
+        'seed': int(seed),
+        'system': system,
+    }
+    return hashlib.sha256(json.dumps(description, sort_keys=True).encode()).hexdigest()[:16]
@@ -0,0 +1,77 @@
+# test_correctness.py
+
+import numpy as np
+
+import seeding
+from battle import battle_pokemon, calculate_type_effectiveness, resolve_battles
+from battle_log import BattleLog
+from mock_pokeapi import fake_pokemon_data
+from montecarlo import shard_size, simulate_championship_odds
+from odds import exact_championship_odds
+from pokemon import DEFAULT_WEIGHTS, STAT_NAMES, Pokemon, Roster
+from scoring import ScoreCache
+from type_chart import NUM_COMBOS
+
+SEED = 2024
+
+
+def synthetic_pokemons(num_pokemons, first_id=1):
+    """Fake Pokémon as mock_pokeapi serves them, without any network access."""
+    return [Pokemon(fake_pokemon_data(first_id + i)) for i in range(num_pokemons)]
+
+
+def close_roster(num_entrants, seed=2):
+    """Entrants with similar stats, so several of them have a real chance at the title."""
+    rng = np.random.default_rng(seed)
+    return Roster(np.arange(1, num_entrants + 1), rng.integers(60, 90, (num_entrants, 6)),
+                  rng.integers(0, NUM_COMBOS, num_entrants))
+
+
+def test_exact_odds_match_monte_carlo():
+    roster = close_roster(8)
+    exact = exact_championship_odds(roster, DEFAULT_WEIGHTS)
+    simulated = simulate_championship_odds(roster, DEFAULT_WEIGHTS, 400_000, seed=SEED)
+    assert (exact['champion_probability'] > 0.01).sum() >= 4
+    np.testing.assert_allclose(simulated['champion_probability'], exact['champion_probability'], atol=1e-3)
+    np.testing.assert_allclose(exact['champion_probability'].sum(), 1.0)
+
+
+def test_odds_do_not_depend_on_worker_count():
+    roster = close_roster(6)
+    num_simulations = 3 * shard_size(len(roster)) + 7  # several shards, the last one partial
+    serial = simulate_championship_odds(roster, DEFAULT_WEIGHTS, num_simulations, seed=SEED, workers=1)
+    parallel = simulate_championship_odds(roster, DEFAULT_WEIGHTS, num_simulations, seed=SEED, workers=2)
+    np.testing.assert_array_equal(serial['round_survival'], parallel['round_survival'])
+
+
+def test_every_score_path_agrees_exactly():
+    pokemons = synthetic_pokemons(1000)
+    roster = Roster.from_pokemons(pokemons)
+    score_cache = ScoreCache(roster)
+    rng = np.random.default_rng(SEED)
+    vectors = np.round(rng.uniform(0.5, 3.0, (8, len(STAT_NAMES))), 1)
+    for vector in vectors:  # the cache only recomputes the columns that moved
+        weights = dict(zip(STAT_NAMES, vector))
+        expected = [p.get_battle_score(weights) for p in pokemons]
+        np.testing.assert_array_equal(roster.scores(weights), expected)
+        np.testing.assert_array_equal(score_cache.scores(weights), expected)
+    np.testing.assert_array_equal(roster.scores(vectors)[-1], roster.scores(vectors[-1]))
+
+
+def test_battle_pokemon_matches_resolve_battles():
+    pokemons = synthetic_pokemons(40, first_id=100)
+    for i, (pokemon1, pokemon2) in enumerate(zip(pokemons[0::2], pokemons[1::2])):
+        scalar_rng, batch_rng = seeding.generator(SEED + i), seeding.generator(SEED + i)
+        log = BattleLog(1)
+        winner = battle_pokemon(pokemon1, pokemon2, DEFAULT_WEIGHTS, log=log, rng=scalar_rng)
+        outcome = resolve_battles(
+            np.array([pokemon1.get_battle_score(DEFAULT_WEIGHTS)]),
+            np.array([pokemon2.get_battle_score(DEFAULT_WEIGHTS)]),
+            np.array([calculate_type_effectiveness(pokemon1, pokemon2)]),
+            np.array([calculate_type_effectiveness(pokemon2, pokemon1)]),
+            batch_rng,
+        )
+        assert (winner is pokemon1) == bool(outcome['first_wins'][0])
+        assert log['adjusted_score1'][0] == outcome['adjusted_score1'][0]
+        assert log['adjusted_score2'][0] == outcome['adjusted_score2'][0]
+        assert scalar_rng.random() == batch_rng.random()  # both consumed the same draws
@@ -0,0 +1,20 @@
+# test_pokedex.py
+
+import api
+from cache import PokemonCache
+from mock_pokeapi import start_server
+from pokedex import Pokedex, preload
+
+
+def test_preload_resumes_after_a_run_that_added_nothing(tmp_path, monkeypatch):
+    monkeypatch.setattr(api, '_cache', PokemonCache(str(tmp_path / 'cache.sqlite')))
+    path = str(tmp_path / 'pokedex.csv')
+    server, base_url = start_server(max_pokemon_id=0)  # the first run gets no Pokémon at all
+    try:
+        assert preload(3, path, base_url=base_url) == 0
+        server.max_pokemon_id = 3
+        assert preload(3, path, base_url=base_url) == 3
+        assert preload(3, path, base_url=base_url) == 0
+    finally:
+        server.shutdown()
+    assert list(Pokedex.load(path).ids) == [1, 2, 3]
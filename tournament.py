@@ -1,22 +1,152 @@
 # tournament.py
 
-from battle import battle_pokemon
+import numpy as np
 
-def run_tournament(pokemons):
-    """Runs the tournament and returns the champion."""
+import metrics
+from battle import resolve_battles
+from battle_log import BYE
+from pokemon import DEFAULT_WEIGHTS, Roster
+from type_chart import effectiveness_batch
+
+
+def bracket_size(num_entrants):
+    """Smallest power of two that fits every entrant."""
+    return 1 << max(0, int(num_entrants) - 1).bit_length()
+
+
+def _bit_reversed(num_pairs):
+    """Pair indices in bit-reversed order, which spreads the first k of them evenly over the bracket."""
+    bits = max(0, num_pairs - 1).bit_length()
+    index = np.arange(num_pairs)
+    reversed_index = np.zeros_like(index)
+    for bit in range(bits):
+        reversed_index |= ((index >> bit) & 1) << (bits - 1 - bit)
+    return np.argsort(reversed_index)
+
+
+def bracket_layout(num_entrants):
+    """
+    First-round slot array: entrant indices in roster order, padded with BYE.
+
+    The bracket is padded to a power of two. Every bye is paired with a real
+    entrant, and the byes are spread evenly so neither half of the bracket is
+    favoured; from round two on every slot holds an entrant.
+    """
+    size = bracket_size(num_entrants)
+    is_bye = np.zeros(size, dtype=bool)
+    bye_pairs = _bit_reversed(size // 2)[:size - num_entrants]
+    is_bye[2 * bye_pairs + 1] = True
+    layout = np.full(size, BYE, dtype=np.int64)
+    layout[~is_bye] = np.arange(num_entrants)
+    return layout
+
+
+def num_rounds(num_entrants):
+    """Number of rounds a single-elimination bracket of this size takes."""
+    return bracket_size(num_entrants).bit_length() - 1
+
+
+def match_record(first, second, winner, played, scores, effectiveness1, effectiveness2, outcome, full=True):
+    """
+    BattleLog record for one round of matches, walkovers included.
+
+    Parameters:
+        first, second, winner (ndarray): Entrant indices per match; second is BYE for a walkover.
+        played (ndarray): Boolean mask of the matches actually fought.
+        scores (ndarray): (N,) battle scores.
+        effectiveness1, effectiveness2, outcome: resolve_battles inputs and result for the played matches.
+        full (bool): Include the factor columns. A walkover keeps its base score as its adjusted score.
+    """
+    record = {'first': first, 'second': second, 'winner': winner}
+    if full:
+        a, b = first[played], second[played]
+        # (walkover value, played values) for every factor column
+        columns = {
+            'score1': (scores[first], scores[a]),
+            'score2': (np.nan, scores[b]),
+            'adjusted_score1': (scores[first], outcome['adjusted_score1']),
+            'adjusted_score2': (np.nan, outcome['adjusted_score2']),
+            'effectiveness1': (1.0, effectiveness1),
+            'effectiveness2': (1.0, effectiveness2),
+            'randomness1': (1.0, outcome['randomness1']),
+            'randomness2': (1.0, outcome['randomness2']),
+            'critical_hit1': (1.0, outcome['critical_hit1']),
+            'critical_hit2': (1.0, outcome['critical_hit2']),
+        }
+        for key, (walkover, values) in columns.items():
+            column = np.array(np.broadcast_to(walkover, first.shape), dtype=np.float64)
+            column[played] = values
+            record[key] = column
+    return record
+
+
+def simulate_bracket(scores, type_combos, rng, log=None, on_round=None):
+    """
+    Plays one single-elimination bracket, each round as a single batched operation.
+
+    Parameters:
+        scores (ndarray): (N,) battle scores.
+        type_combos (ndarray): (N,) type combos.
+        rng (numpy.random.Generator): Source of all battle randomness.
+        log (BattleLog): Optional log that receives every match, walkovers included.
+        on_round (callable): Called as on_round(round_number, winners) after each round,
+            e.g. to show live progress.
+
+    Returns:
+        int: Roster index of the champion.
+    """
+    slots = bracket_layout(len(scores))
     round_number = 1
-    current_pokemons = pokemons.copy()
-    while len(current_pokemons) > 1:
-        print(f"\n--- Round {round_number} ---")
-        next_round = []
-        for i in range(0, len(current_pokemons), 2):
-            pokemon1 = current_pokemons[i]
-            pokemon2 = current_pokemons[i + 1]
-            winner = battle_pokemon(pokemon1, pokemon2)
-            next_round.append(winner)
-        current_pokemons = next_round
+    while len(slots) > 1:
+        first, second = slots[0::2], slots[1::2]
+        played = second != BYE
+        a, b = first[played], second[played]
+        effectiveness1 = effectiveness_batch(type_combos[a], type_combos[b])
+        effectiveness2 = effectiveness_batch(type_combos[b], type_combos[a])
+        outcome = resolve_battles(scores[a], scores[b], effectiveness1, effectiveness2, rng)
+
+        winner = first.copy()
+        winner[played] = np.where(outcome['first_wins'], a, b)
+        if log is not None:
+            log.append(round_number, match_record(
+                first, second, winner, played, scores, effectiveness1, effectiveness2, outcome, log.full
+            ))
+        if on_round is not None:
+            on_round(round_number, winner)
+        slots = winner
         round_number += 1
+    return int(slots[0])
+
+
+@metrics.timed('tournament.run_tournament')
+def run_tournament(pokemons, weights=DEFAULT_WEIGHTS, rng=None, log=None):
+    """
+    Runs the tournament and returns the champion.
+
+    Nothing is printed; pass a BattleLog to record the battles, and call its
+    replay() with the Pokémon names to print them.
+    """
+    rng = rng if rng is not None else np.random.default_rng()
+    roster = Roster.from_pokemons(pokemons)
+    return pokemons[simulate_bracket(roster.scores(weights), roster.type_combos, rng, log)]
+
+
+def run_tournaments(roster, weights, num_tournaments, rng=None, log_factory=None):
+    """
+    Plays num_tournaments independent brackets over one roster, scoring it only once.
+
+    Parameters:
+        roster (Roster): Entrants; no Pokemon objects are needed.
+        weights (dict or ndarray): Stat weights, passed explicitly rather than read from any UI state.
+        num_tournaments (int): Number of brackets to play.
+        rng (numpy.random.Generator): Source of all battle randomness.
+        log_factory (callable): Optional; called once per tournament to get a fresh BattleLog.
 
-    champion = current_pokemons[0]
-    print(f"\nChampion of the Tournament: {champion.name}! 🏆")
-    return champion
+    Yields:
+        tuple: (champion roster index, BattleLog or None) per tournament, as soon as it is played.
+    """
+    rng = rng if rng is not None else np.random.default_rng()
+    scores = roster.scores(weights)
+    for _ in range(num_tournaments):
+        log = log_factory() if log_factory is not None else None
+        yield simulate_bracket(scores, roster.type_combos, rng, log), log
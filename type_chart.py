@@ -1,5 +1,7 @@
 # type_chart.py
 
+import numpy as np
+
 # Full type effectiveness chart
 type_chart = {
     'normal': {
@@ -75,3 +77,38 @@ type_chart = {
         'poison': 0.5, 'steel': 0.5
     }
 }
+
+# Integer type IDs, in chart order
+TYPE_NAMES = list(type_chart)
+TYPE_IDS = {name: i for i, name in enumerate(TYPE_NAMES)}
+NUM_TYPES = len(TYPE_NAMES)
+NO_TYPE = NUM_TYPES  # stands in for a missing second type or a type not in the chart
+
+# TYPE_MATRIX[attack_type, defense_type], with an all-1 row and column for NO_TYPE
+TYPE_MATRIX = np.ones((NUM_TYPES + 1, NUM_TYPES + 1))
+for _attack_type, _row in type_chart.items():
+    for _defense_type, _effectiveness in _row.items():
+        TYPE_MATRIX[TYPE_IDS[_attack_type], TYPE_IDS[_defense_type]] = _effectiveness
+
+# A type combo packs a Pokémon's (first, second) type IDs into one index: first * (NUM_TYPES + 1) + second.
+# COMBO_MATRIX[attacker_combo, defender_combo] is the product over every attacking and defending type,
+# i.e. exactly what calculate_type_effectiveness returns for that pair (all factors are powers of two).
+NUM_COMBOS = (NUM_TYPES + 1) ** 2
+_first, _second = np.divmod(np.arange(NUM_COMBOS), NUM_TYPES + 1)
+COMBO_MATRIX = (
+    TYPE_MATRIX[_first[:, None], _first[None, :]]
+    * TYPE_MATRIX[_first[:, None], _second[None, :]]
+    * TYPE_MATRIX[_second[:, None], _first[None, :]]
+    * TYPE_MATRIX[_second[:, None], _second[None, :]]
+)
+
+
+def type_combo(types):
+    """Packs a list of type names into a type combo index."""
+    ids = [TYPE_IDS.get(name, NO_TYPE) for name in types[:2]] + [NO_TYPE, NO_TYPE]
+    return ids[0] * (NUM_TYPES + 1) + ids[1]
+
+
+def effectiveness_batch(attacker_combos, defender_combos):
+    """Type effectiveness multipliers for arrays of (attacker, defender) combos, in one gather."""
+    return COMBO_MATRIX[attacker_combos, defender_combos]